@@ -1,32 +1,67 @@
 import json
-from audio_input import record_audio
-from stt import speech_to_text
+import sys
+import threading
+import uuid
+from stt import listen, LANGUAGE_CONFIRM_TEXT
 from planner import planner
 from memory import ConversationMemory
-from tools.eligibility_engine import check_eligibility
-from tts import speak
-from logger import log_info, log_error, log_warning
+from tools.eligibility_session import EligibilitySession
+from session_store import load_checkpoint, track, finish
+from tts import speak, speak_streaming, warm_up
+from logger import log_info, log_error, log_warning, set_session, next_turn, timed
+from prompts import (
+    SUPPORTED_LANGUAGES,
+    LANGUAGE_SELECT_TEXT,
+    GREET_TEXT,
+    RESUME_TEXT,
+    FIELD_PROMPTS,
+    field_prompt,
+    thank_you_text,
+)
+from local_extractor import FAST_PATH_CONFIDENCE, extract_field, extract_spoken_numbers, plausible
+from keyword_matcher import get_matcher
+from tracing import span
+import tracing
 import re
 
 
-# ================= LANGUAGE CONFIG =================
+# ================= STATIC PROMPTS =================
 
-LANGUAGE_OPTIONS = {
-    "hindi": "hi",
-    "हिंदी": "hi",
+def static_prompts():
+    """Every fixed (text, language) pair the agent can speak."""
+    yield LANGUAGE_SELECT_TEXT, "hi"
+    for language in SUPPORTED_LANGUAGES:
+        yield GREET_TEXT[language], language
+        yield RESUME_TEXT[language], language
+        yield LANGUAGE_CONFIRM_TEXT[language], language
+        for field in FIELD_PROMPTS:
+            yield field_prompt(field, language), language
+        yield thank_you_text(language), language
 
-    "telugu": "te",
-    "తెలుగు": "te",
 
-    "marathi": "mr",
-    "मराठी": "mr",
+def warm_up_prompts():
+    """Pre-synthesizes all static prompts so they play from the TTS cache."""
+    with span("agent_loop.warm_up"):
+        synthesized = warm_up(static_prompts())
+    log_info(f"TTS warm-up synthesized {synthesized} prompts")
+    return synthesized
 
-    "tamil": "ta",
-    "தமிழ்": "ta",
 
-    "bengali": "bn",
-    "বাংলা": "bn"
-}
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+
+def start_warm_up():
+    """
+    Runs warm_up_prompts once per process on a background thread, so
+    no call waits for it; prompts not cached yet are synthesized on demand.
+    """
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up_prompts, name="tts-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
 
 
 def select_language():
@@ -36,15 +71,10 @@ def select_language():
     - Map to internal language code
     """
 
-    speak(
-        "Please say Hindi, Telugu, Marathi, Tamil, or Bengali to choose your language.",
-        "hi"
-    )
-
-    audio_path = record_audio("audio/language_select.wav")
+    speak(LANGUAGE_SELECT_TEXT, "hi")
 
     # 👇 BOOTSTRAP STT: always English
-    stt_result = speech_to_text(audio_path, language_hint="hi")
+    stt_result = listen_turn("audio/language_select.wav", "hi")
 
     if not stt_result["success"]:
         log_warning("Language selection STT failed. Defaulting to Hindi.")
@@ -53,26 +83,19 @@ def select_language():
     spoken_text = stt_result["text"].lower()
     log_info(f"Language selection input: {spoken_text}")
 
-    LANGUAGE_KEYWORDS = {
-        "hindi": "hi",
-        "हिंदी": "hi",
+    return detect_language(spoken_text)
 
-        "telugu": "te",
-        "తెలుగు": "te",
 
-        "marathi": "mr",
-        "मराठी": "mr",
+def listen_turn(filename, language):
+    """Captures one user turn under a new turn id and logs its latency."""
+    next_turn()
+    with timed("listen", language=language):
+        return listen(filename, language_hint=language)
 
-        "tamil": "ta",
-        "தமிழ்": "ta",
 
-        "bengali": "bn",
-        "বাংলা": "bn"
-    }
-
-    for keyword, lang_code in LANGUAGE_KEYWORDS.items():
-        if keyword in spoken_text:
-            return lang_code
+def detect_language(spoken_text):
+    """Maps a transcribed language name to its code, or None."""
+    return get_matcher("languages").first(spoken_text)
 
 # ================= Extract Numbers =================
 def extract_numbers(text):
@@ -84,83 +107,115 @@ def extract_numbers(text):
     return [int(m) for m in matches]
 
 
+def parse_field_answer(field, val, language="hi", memory=None):
+    """
+    Extracts a profile value for field from a lowercased transcript.
+    Handles digits, spoken number words and state names in all five
+    languages. Answers the local rules are not confident about (several
+    numbers, an implausible age) go to the planner when memory is given.
+    Returns None if the answer could not be understood.
+    """
+    value, confidence = extract_field(field, val, language)
+    if confidence >= FAST_PATH_CONFIDENCE:
+        return value
+    if memory is None:
+        return None
+    return field_from_plan(field, planner(val, memory, language), language)
+
+
+def field_from_plan(field, plan, language="hi"):
+    """The planner's value for field, or None if it has none or it is implausible."""
+    if plan.get("source") == "fallback":
+        # The LLM is degraded and its stand-in is the rules that were unsure
+        return None
+    value = (plan.get("slots") or {}).get(field)
+    if isinstance(value, str) and field != "state":
+        numbers, _ = extract_spoken_numbers(value, language)
+        value = numbers[-1] if numbers else None
+    return value if plausible(field, value) else None
+
+
+def build_response(result, language):
+    """Spoken summary of an eligibility result."""
+    if result.get("eligible"):
+        schemes = ", ".join(result["eligible"])
+        return f"आप {schemes} के लिए पात्र हैं।" if language == "hi" else f"మీరు {schemes}కు అర్హులు."
+
+    error_msg = result.get("error", "कोई योजना नहीं मिली")
+    return f"क्षमा करें: {error_msg}" if language == "hi" else f"క్షమించండి: {error_msg}"
+
+
 # ================= AGENT LOOP =================
 
-def agent_loop():
-    log_info("Agent started")
+def agent_loop(caller_id=None):
+    """
+    One call. With a caller_id the session is checkpointed as answers
+    arrive, and an unfinished session of the same caller is resumed.
+    """
+    set_session(uuid.uuid4().hex[:12])
+    log_info("Agent started", caller_id=caller_id)
     print("\n" + "="*30)
     print("🚀 VOICE-BASED AGENT")
     print("="*30)
 
-    # 1. Language Selection
-    language = select_language()
-    log_info(f"User selected language: {language}")
-    print(f"🌐 Language set to: {language}")
-    
-    # 2. Initial Greeting & Question
-    greet_text = {
-        "te": "నమస్కారం, దయచేసి మీ ప్రశ్న చెప్పండి.",
-        "hi": "नमस्ते, कृपया अपना प्रश्न बताएं।",
-        "mr": "नमस्कार, कृपया तुमचा प्रश्न सांगा.",
-        "ta": "வணக்கம், தயவுசெய்து உங்கள் கேள்வியை கூறுங்கள்.",
-        "bn": "নমস্কার, অনুগ্রহ করে আপনার প্রশ্ন বলুন।"
-    }
-    speak(greet_text.get(language, greet_text["hi"]), language)
-
-    # 3. Capture Initial Request
-    audio_path = record_audio("audio/init.wav")
-    stt_result = speech_to_text(audio_path, language_hint=language)
-    
-    memory = ConversationMemory(language)
-    if stt_result["success"]:
-        memory.add_user_utterance(stt_result["text"])
+    checkpoint = load_checkpoint(caller_id)
+    if checkpoint:
+        # Dropped call: skip language selection and answered questions
+        language = checkpoint["language"]
+        memory = ConversationMemory(language)
+        memory.restore(checkpoint["profile"])
+        print(f"🔁 Resuming {caller_id} in {language}: {checkpoint['profile']}")
+        speak(RESUME_TEXT.get(language, RESUME_TEXT["hi"]), language)
+    else:
+        # 1. Language Selection
+        with span("agent_loop.select_language"):
+            language = select_language()
+        log_info(f"User selected language: {language}")
+        print(f"🌐 Language set to: {language}")
+
+        # 2. Initial Greeting & Question
+        with span("agent_loop.greet", language=language):
+            speak(GREET_TEXT.get(language, GREET_TEXT["hi"]), language)
+
+            # 3. Capture Initial Request
+            stt_result = listen_turn("audio/init.wav", language)
+
+        memory = ConversationMemory(language)
+        if stt_result["success"]:
+            memory.add_user_utterance(stt_result["text"])
+
+    track(memory, caller_id)
+    eligibility = EligibilitySession.attach(memory)
 
     # 3. Targeted Sequential Collection
-    # We define the order: Age -> Income -> State
-    required_fields = ["age", "income", "state"]
-    
-    for field in required_fields:
+    # Only fields that can still change the outcome are asked, the one
+    # that best splits the remaining schemes first
+    asked = set()
+
+    while not eligibility.is_decided():
+        field = eligibility.next_field(exclude=asked)
+        if field is None:
+            break
+        asked.add(field)
+
         attempts = 0
         while attempts < 3:
-            # Check if we already have it from the initial query
-            current_profile = memory.get_memory_snapshot()["profile"]
-            if current_profile.get(field) is not None:
-                print(f"✅ Already have {field}: {current_profile[field]}")
-                break
-            
             # System asks specifically for the missing field
-            prompts = {
-                "age": ("आपकी उम्र क्या है?", "మీ వయస్సు ఎంత?"),
-                "income": ("आपकी वार्षिक आय क्या है?", "మీ వార్షిక ఆదాయం ఎంత?"),
-                "state": ("आप किस राज्य में रहते हैं?", "మీరు ఏ రాష్ట్రంలో నివసిస్తున్నారు?")
-            }
-            speak(prompts[field][0] if language == "hi" else prompts[field][1], language)
-            
-            audio_path = record_audio(f"audio/{field}_retry_{attempts}.wav")
-            stt_result = speech_to_text(audio_path, language_hint=language)
-            
+            with span("agent_loop.ask_field", field=field, attempt=attempts):
+                speak(field_prompt(field, language), language)
+
+                stt_result = listen_turn(f"audio/{field}_retry_{attempts}.wav", language)
+
             if stt_result["success"]:
                 val = stt_result["text"].lower()
                 print(f"🗨️ User said for {field}: {val}")
-                
-                if field in ["age", "income"]:
-                    nums = extract_numbers(val)
-                    if nums:
-                        # Logic Fix: If asking for income, take the largest number or the second number
-                        # if the user said "My age is 7 and income is 20000"
-                        extracted_val = nums[-1] if len(nums) > 1 else nums[0]
-                        memory.update_profile(field, extracted_val)
-                        print(f"DEBUG: Saved {field} -> {extracted_val}")
-                        break
-                
-                if field == "state":
-                    # Improved detection including Native Script
-                    if any(s in val for s in ["telangana", "తెలంగాణ", "तेलंगाना"]):
-                        memory.update_profile("state", "telangana")
-                        break
-                    elif any(s in val for s in ["maharashtra", "महाराष्ट्र", "మహారాష్ట్ర"]):
-                        memory.update_profile("state", "maharashtra")
-                        break
+
+                with span("agent_loop.parse_field", field=field):
+                    extracted_val = parse_field_answer(field, val, language, memory.get_memory_snapshot())
+                if extracted_val is not None:
+                    memory.update_profile(field, extracted_val)
+                    print(f"DEBUG: Saved {field} -> {extracted_val}")
+                    break
             
             attempts += 1
             print(f"⚠️ Failed to catch {field}, attempt {attempts}/3")
@@ -169,19 +224,36 @@ def agent_loop():
     final_profile = memory.get_memory_snapshot()["profile"]
     print(f"\n📊 FINAL PROFILE FOR TOOL: {final_profile}")
     
-    result = check_eligibility(final_profile)
+    with timed("check_eligibility"):
+        # Skipped fields could not have changed the outcome; fields still
+        # unanswered after three tries are reported, as the tool would
+        result = eligibility.result()
     log_info(f"Tool Result: {result}")
 
     # 5. Result Output
-    if result.get("eligible"):
-        schemes = ", ".join(result["eligible"])
-        response = f"आप {schemes} के लिए पात्र हैं।" if language == "hi" else f"మీరు {schemes}కు అర్హులు."
-    else:
-        error_msg = result.get("error", "कोई योजना नहीं मिली")
-        response = f"क्षमा करें: {error_msg}" if language == "hi" else f"క్షమించండి: {error_msg}"
-
-    speak(response, language)
-    speak("धन्यवाद।" if language == "hi" else "ధన్యవాదాలు.", language)
+    with span("agent_loop.respond"):
+        response = build_response(result, language)
+        speak_streaming(response, language)
+        speak(thank_you_text(language), language)
+    finish(caller_id)
 
 if __name__ == "__main__":
-    agent_loop()
\ No newline at end of file
+    args = sys.argv[1:]
+    # --caller ID: checkpoint this call, resuming ID's unfinished one
+    caller_id = args[args.index("--caller") + 1] if "--caller" in args[:-1] else None
+    if "--warmup" in args:
+        print(f"🔥 Pre-synthesized {warm_up_prompts()} prompts")
+    elif "--trace" in args:
+        # --trace [path]: record spans, then write a Chrome trace and print the stage table
+        index = args.index("--trace")
+        trace_path = args[index + 1] if index + 1 < len(args) and not args[index + 1].startswith("--") else "logs/trace.json"
+        tracing.enable()
+        start_warm_up()
+        try:
+            agent_loop(caller_id)
+        finally:
+            print(f"🧭 Trace written to {tracing.export_chrome_trace(trace_path)}")
+            print(tracing.format_summary())
+    else:
+        start_warm_up()
+        agent_loop(caller_id)
\ No newline at end of file
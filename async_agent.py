@@ -0,0 +1,201 @@
+import asyncio
+import contextvars
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from audio_input import record_audio
+from stt import listen, speech_to_text
+from planner import planner
+from memory import ConversationMemory
+from tools.eligibility_engine import check_eligibility
+from tools.eligibility_session import EligibilitySession
+from tts import speak_async
+from logger import log_info, log_warning, session_id_var, set_session, next_turn, timed
+from prompts import LANGUAGE_SELECT_TEXT, GREET_TEXT, RESUME_TEXT, field_prompt, thank_you_text
+from session_store import load_checkpoint, track, finish
+from agent_loop import detect_language, parse_field_answer, field_from_plan, build_response
+from tracing import span
+
+# Blocking SDK calls (TTS, capture, STT, LLM) run on this bounded pool,
+# shared by every session on the event loop.
+BLOCKING_WORKERS = int(os.getenv("AGENT_BLOCKING_WORKERS", "32"))
+
+# The recorder is armed this long before a prompt finishes playing
+ARM_LEAD_SECONDS = 0.5
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="agent-io")
+
+
+async def run_blocking(func, *args, **kwargs):
+    # run_in_executor does not carry contextvars; copy them so log
+    # records from the worker keep the session and turn ids
+    loop = asyncio.get_running_loop()
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, partial(context.run, func, *args, **kwargs))
+
+
+# ================= ASYNC WRAPPERS =================
+
+async def aspeak(text, language="hi", arm_lead=None):
+    """
+    Queues text for playback.
+    arm_lead=None waits until playback ends; otherwise returns once less
+    than arm_lead seconds remain, with the tail still playing.
+    Returns the playing Clip.
+    """
+    loop = asyncio.get_running_loop()
+    finished = loop.create_future()
+
+    def on_done(clip):
+        loop.call_soon_threadsafe(_resolve, finished, clip)
+
+    clip = await run_blocking(speak_async, text, language, on_done)
+
+    if arm_lead is None:
+        await finished
+    else:
+        remaining = clip.remaining_seconds - arm_lead
+        if remaining > 0 and not finished.done():
+            await asyncio.sleep(remaining)
+    return clip
+
+
+def _resolve(future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+async def arecord_audio(filename=None, pre_roll_seconds=None):
+    if pre_roll_seconds is None:
+        return await run_blocking(record_audio, filename)
+    return await run_blocking(record_audio, filename, pre_roll_seconds)
+
+
+async def aspeech_to_text(audio, language_hint):
+    return await run_blocking(speech_to_text, audio, language_hint)
+
+
+async def aplanner(user_text, memory, language):
+    return await run_blocking(planner, user_text, memory, language)
+
+
+async def acheck_eligibility(user_profile):
+    return await run_blocking(check_eligibility, user_profile)
+
+
+# ================= SESSION I/O =================
+
+class LocalIO:
+    """Session I/O on the local microphone and speakers."""
+
+    async def speak(self, text, language, arm_lead=None):
+        return await aspeak(text, language, arm_lead)
+
+    async def listen(self, filename, language, prompt_clip=None):
+        # Capture starts as soon as the prompt's remaining tail has played
+        pre_roll = prompt_clip.remaining_seconds if prompt_clip else None
+        return await run_blocking(listen, filename, language, pre_roll)
+
+
+async def ask(io, text, language, filename):
+    """Speaks a prompt and captures the reply, arming capture during the tail."""
+    next_turn()
+    with timed("prompt", language=language), span("ask.prompt", language=language):
+        clip = await io.speak(text, language, arm_lead=ARM_LEAD_SECONDS)
+    with timed("listen", language=language), span("ask.listen", language=language):
+        return await io.listen(filename, language, clip)
+
+
+# ================= ASYNC AGENT LOOP =================
+
+async def async_agent_loop(io=None, memory_factory=ConversationMemory, caller_id=None):
+    """
+    Async counterpart of agent_loop.agent_loop. All blocking work runs on
+    the shared executor, so one event loop can drive many sessions, each
+    with its own io.
+    memory_factory(language) creates the session's ConversationMemory.
+    caller_id: the session is checkpointed under it, and an unfinished
+    session of the same caller is resumed instead of starting over.
+    """
+    io = io or LocalIO()
+    if session_id_var.get() is None:
+        set_session(uuid.uuid4().hex[:12])
+    log_info("Async agent session started")
+
+    checkpoint = await run_blocking(load_checkpoint, caller_id) if caller_id else None
+    if checkpoint:
+        # Dropped call: language and answers so far are restored
+        language = checkpoint["language"]
+        memory = memory_factory(language)
+        memory.restore(checkpoint["profile"])
+        await io.speak(RESUME_TEXT.get(language, RESUME_TEXT["hi"]), language)
+    else:
+        # 1. Language Selection
+        stt_result = await ask(io, LANGUAGE_SELECT_TEXT, "hi", "audio/language_select.wav")
+        if not stt_result["success"]:
+            log_warning("Language selection STT failed. Defaulting to Hindi.")
+            language = "hi"
+        else:
+            spoken_text = stt_result["text"].lower()
+            log_info(f"Language selection input: {spoken_text}")
+            language = detect_language(spoken_text)
+        log_info(f"User selected language: {language}")
+
+        # 2. Initial Greeting & Question
+        greeting = GREET_TEXT.get(language, GREET_TEXT["hi"])
+        stt_result = await ask(io, greeting, language, "audio/init.wav")
+
+        memory = memory_factory(language)
+        if stt_result["success"]:
+            memory.add_user_utterance(stt_result["text"])
+
+    track(memory, caller_id)
+    eligibility = EligibilitySession.attach(memory)
+
+    # 3. Targeted Sequential Collection, skipping fields that cannot
+    # change the outcome
+    asked = set()
+    while not eligibility.is_decided():
+        field = eligibility.next_field(exclude=asked)
+        if field is None:
+            break
+        asked.add(field)
+
+        for attempt in range(3):
+            stt_result = await ask(
+                io, field_prompt(field, language), language, f"audio/{field}_retry_{attempt}.wav"
+            )
+            if stt_result["success"]:
+                text = stt_result["text"].lower()
+                value = parse_field_answer(field, text, language)
+                if value is None:
+                    # Not confident locally: let the planner read it, off the loop
+                    plan = await aplanner(text, memory.get_memory_snapshot(), language)
+                    value = field_from_plan(field, plan, language)
+                if value is not None:
+                    memory.update_profile(field, value)
+                    break
+
+    # 4. Final Tool Execution
+    with timed("check_eligibility"):
+        # Only fields that could change the outcome count as missing
+        result = eligibility.result()
+    log_info(f"Tool Result: {result}")
+
+    # 5. Result Output
+    with span("agent_loop.respond"):
+        await io.speak(build_response(result, language), language)
+        await io.speak(thank_you_text(language), language)
+    finish(caller_id)
+    return result
+
+
+async def run_sessions(ios):
+    """Drives one async_agent_loop per io concurrently."""
+    return await asyncio.gather(*(async_agent_loop(io) for io in ios))
+
+
+if __name__ == "__main__":
+    asyncio.run(async_agent_loop())
@@ -1,33 +1,214 @@
-import sounddevice as sd
-from scipy.io.wavfile import write
+# sounddevice and scipy are imported on first use to keep startup fast
 import numpy as np
+import queue
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
+from tracing import span
 
 SAMPLE_RATE = 16000  # standard for STT
 CHANNELS = 1
 RECORD_SECONDS = 8   # we’ll adjust later
+PRE_ROLL_SECONDS = 2
 
-def record_audio(filename="user_input.wav"):
-    print("\n🎙️ Recording will start in 2 seconds...")
-    time.sleep(2)
+# Streaming capture: 30 ms frames (480 samples at 16 kHz)
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+
+# Captured audio stays in memory; set SAVE_DEBUG_AUDIO=1 to also keep
+# WAV copies on disk (written off the capture path).
+SAVE_DEBUG_AUDIO = os.getenv("SAVE_DEBUG_AUDIO", "0") == "1"
+
+_debug_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="audio-debug")
+
+
+def save_debug_audio(filename, audio):
+    """Writes a WAV copy of captured audio in the background."""
+    def _write():
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        from scipy.io.wavfile import write
+        write(filename, SAMPLE_RATE, audio)
+
+    return _debug_writer.submit(_write)
+
+
+def record_audio(filename=None, pre_roll_seconds=PRE_ROLL_SECONDS):
+    """
+    Records a fixed-length utterance and returns it as a 1-D int16 array.
+    filename is only used for the optional debug copy.
+    pre_roll_seconds: wait before capture starts (e.g. the remaining tail
+    of a prompt that is still playing).
+    """
+    print(f"\n🎙️ Recording will start in {pre_roll_seconds:.1f} seconds...")
+    with span("record.pre_roll"):
+        time.sleep(pre_roll_seconds)
     print("🔴 Recording... Speak now")
 
-    audio = sd.rec(
-        int(RECORD_SECONDS * SAMPLE_RATE),
-        samplerate=SAMPLE_RATE,
-        channels=CHANNELS,
-        dtype=np.int16
-    )
+    import sounddevice as sd
+    with span("record.capture"):
+        audio = sd.rec(
+            int(RECORD_SECONDS * SAMPLE_RATE),
+            samplerate=SAMPLE_RATE,
+            channels=CHANNELS,
+            dtype=np.int16
+        )
+
+        sd.wait()
+    audio = audio.reshape(-1)
+
+    if SAVE_DEBUG_AUDIO and filename:
+        save_debug_audio(filename, audio)
+
+    print("✅ Recording complete")
+    return audio
+
+
+# ================= VOICE ACTIVITY DETECTION =================
+
+class EnergyVAD:
+    """
+    Energy-based endpointing.
+    The utterance ends after `silence_ms` of quiet following speech,
+    after `no_speech_seconds` if nobody speaks, or at `max_seconds`.
+    """
+
+    def __init__(self, threshold=500, silence_ms=600, min_speech_ms=90,
+                 no_speech_seconds=5, max_seconds=RECORD_SECONDS):
+        self.threshold = threshold
+        self.silence_ms = silence_ms
+        self.min_speech_ms = min_speech_ms
+        self.no_speech_ms = no_speech_seconds * 1000
+        self.max_ms = max_seconds * 1000
+        self.reset()
+
+    def reset(self):
+        self.speech_ms = 0
+        self.trailing_silence_ms = 0
+        self.total_ms = 0
+
+    def is_speech(self, frame):
+        samples = frame.astype(np.float32)
+        return np.sqrt(np.mean(samples * samples)) >= self.threshold
+
+    def update(self, frame):
+        """Feeds one int16 frame. Returns True when the utterance has ended."""
+        frame_ms = len(frame) * 1000 / SAMPLE_RATE
+        self.total_ms += frame_ms
+
+        if self.is_speech(frame):
+            self.speech_ms += frame_ms
+            self.trailing_silence_ms = 0
+        else:
+            self.trailing_silence_ms += frame_ms
+
+        if self.total_ms >= self.max_ms:
+            return True
+        if self.speech_ms >= self.min_speech_ms:
+            return self.trailing_silence_ms >= self.silence_ms
+        return self.total_ms >= self.no_speech_ms
+
+
+# ================= MICROPHONES =================
+
+class Microphone:
+    """Live sounddevice input stream delivering fixed-size int16 frames."""
+
+    def __init__(self, frame_samples=FRAME_SAMPLES):
+        self.frame_samples = frame_samples
+        self._frames = queue.Queue()
+        self._stream = None
+
+    def _callback(self, indata, frames, time_info, status):
+        self._frames.put(indata[:, 0].copy())
+
+    def __enter__(self):
+        import sounddevice as sd
+        self._stream = sd.InputStream(
+            samplerate=SAMPLE_RATE,
+            channels=CHANNELS,
+            dtype="int16",
+            blocksize=self.frame_samples,
+            callback=self._callback
+        )
+        self._stream.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def frames(self):
+        while True:
+            yield self._frames.get()
+
+
+class WavMicrophone:
+    """
+    Fake microphone that replays a 16 kHz WAV file frame by frame,
+    followed by silence so the VAD can endpoint. Used for offline tests.
+    """
+
+    def __init__(self, path, frame_samples=FRAME_SAMPLES, realtime=False, tail_silence_ms=2000):
+        self.path = path
+        self.frame_samples = frame_samples
+        self.realtime = realtime
+        self.tail_silence_ms = tail_silence_ms
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def frames(self):
+        from scipy.io.wavfile import read
+        rate, audio = read(self.path)
+        if rate != SAMPLE_RATE:
+            raise ValueError(f"Expected {SAMPLE_RATE} Hz audio, got {rate} Hz")
+        if audio.ndim > 1:
+            audio = audio[:, 0]
+
+        silence = np.zeros(SAMPLE_RATE * self.tail_silence_ms // 1000, dtype=np.int16)
+        audio = np.concatenate([audio.astype(np.int16), silence])
+
+        for start in range(0, len(audio), self.frame_samples):
+            if self.realtime:
+                time.sleep(self.frame_samples / SAMPLE_RATE)
+            yield audio[start:start + self.frame_samples]
+
 
-    sd.wait()
-    write(filename, SAMPLE_RATE, audio)
+def stream_utterance(microphone=None, vad=None, skip_seconds=0):
+    """
+    Yields int16 frames as they are captured and stops at the VAD endpoint,
+    so a streaming recognizer can consume them while the user is speaking.
+    skip_seconds: the stream is opened right away but frames captured in
+    this window (e.g. a prompt's tail still playing) are dropped.
+    """
+    microphone = microphone or Microphone()
+    vad = vad or EnergyVAD()
+    skip_samples = int(skip_seconds * SAMPLE_RATE)
 
-    print(f"✅ Recording saved as: {filename}")
-    return filename
+    print("🔴 Listening... Speak now")
+    with microphone:
+        for frame in microphone.frames():
+            if skip_samples > 0:
+                dropped = min(skip_samples, len(frame))
+                skip_samples -= dropped
+                frame = frame[dropped:]
+                if not len(frame):
+                    continue
+            yield frame
+            if vad.update(frame):
+                break
+    print("✅ End of speech detected")
 
 
 if __name__ == "__main__":
+    from scipy.io.wavfile import write
     os.makedirs("audio", exist_ok=True)
     filepath = os.path.join("audio", "test_input.wav")
-    record_audio(filepath)
\ No newline at end of file
+    write(filepath, SAMPLE_RATE, record_audio())
+    print(f"✅ Recording saved as: {filepath}")
@@ -0,0 +1,109 @@
+"""
+Real-time factor and word error rate of the CPU ASR backends against the
+fp32 baseline.
+
+Fixtures are 16 kHz mono WAV files; a sibling .txt file with the same
+name holds the reference transcript (optional).
+
+    python -m benchmarks.asr_backends fixtures/asr/ --backends torch int8 onnx
+"""
+import argparse
+import glob
+import os
+import time
+
+from scipy.io.wavfile import read
+
+from stt_handler import AI4BharatSTT, ASR_BACKENDS, SAMPLE_RATE
+
+
+def word_error_rate(reference, hypothesis):
+    """Word-level Levenshtein distance divided by the reference length."""
+    ref = reference.split()
+    hyp = hypothesis.split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word)
+            ))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_fixtures(directory):
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.wav"))):
+        rate, audio = read(path)
+        if rate != SAMPLE_RATE:
+            raise ValueError(f"{path}: expected {SAMPLE_RATE} Hz, got {rate} Hz")
+
+        reference = None
+        txt_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(txt_path):
+            with open(txt_path, "r", encoding="utf-8") as f:
+                reference = f.read().strip()
+
+        fixtures.append((os.path.basename(path), audio, reference))
+    return fixtures
+
+
+def transcribe_all(stt, fixtures):
+    """Returns (transcripts, processing seconds) for all fixtures."""
+    stt.process_audio(fixtures[0][1])  # warm-up, not measured
+
+    transcripts = []
+    elapsed = 0.0
+    for _, audio, _ in fixtures:
+        start = time.perf_counter()
+        result = stt.process_audio(audio)
+        elapsed += time.perf_counter() - start
+        transcripts.append(result.get("text", ""))
+    return transcripts, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("fixtures", help="directory of WAV (+ .txt) fixtures")
+    parser.add_argument("--model", default="ai4bharat/indicwhisper-hindi")
+    parser.add_argument("--backends", nargs="+", default=list(ASR_BACKENDS), choices=ASR_BACKENDS)
+    args = parser.parse_args()
+
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        parser.error(f"No WAV files in {args.fixtures}")
+    audio_seconds = sum(len(audio) for _, audio, _ in fixtures) / SAMPLE_RATE
+
+    # fp32 is always run first: it is the baseline for the others
+    backends = ["torch"] + [b for b in args.backends if b != "torch"]
+    baseline = None
+
+    print(f"{len(fixtures)} fixtures, {audio_seconds:.1f}s of audio")
+    print(f"{'backend':8} {'RTF':>7} {'speedup':>8} {'WER ref':>8} {'WER fp32':>9}")
+
+    for backend in backends:
+        stt = AI4BharatSTT(args.model, device="cpu", backend=backend)
+        transcripts, elapsed = transcribe_all(stt, fixtures)
+        del stt
+
+        if baseline is None:
+            baseline = (transcripts, elapsed)
+
+        scored = [(ref, hyp) for (_, _, ref), hyp in zip(fixtures, transcripts) if ref is not None]
+        wer_ref = sum(word_error_rate(ref, hyp) for ref, hyp in scored) / len(scored) if scored else float("nan")
+        wer_fp32 = sum(
+            word_error_rate(ref, hyp) for ref, hyp in zip(baseline[0], transcripts)
+        ) / len(transcripts)
+
+        print(f"{backend:8} {elapsed / audio_seconds:7.3f} {baseline[1] / elapsed:7.2f}x "
+              f"{wer_ref:8.3f} {wer_fp32:9.3f}")
+
+
+if __name__ == "__main__":
+    main()
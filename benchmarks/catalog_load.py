@@ -0,0 +1,98 @@
+"""
+Catalog startup: parsing schemes.json versus memory-mapping the compiled
+binary, on synthetic catalogs of increasing size. Each load runs in a
+fresh interpreter, as a new worker process would; "heap" is what the
+catalog keeps on that process's private Python heap.
+
+    python -m benchmarks.catalog_load --sizes 1000 10000 50000
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+
+from tools.scheme_binary import compile_file
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATES = ["telangana", "andhra pradesh", "karnataka", "tamil nadu", "kerala", "maharashtra", "west bengal"]
+
+LOAD = """
+import sys, time, tracemalloc
+from tools.scheme_retriever import SchemeCatalog
+if sys.argv[3] == "heap":
+    tracemalloc.start()
+start = time.perf_counter()
+catalog = SchemeCatalog(sys.argv[1], sys.argv[2])
+catalog.refresh()
+catalog.snapshot.over_income(100000)
+elapsed = time.perf_counter() - start
+print(catalog.source, elapsed, tracemalloc.get_traced_memory()[0])
+"""
+
+
+def make_catalog(count, seed=0):
+    rng = random.Random(seed)
+    schemes = []
+    for i in range(count):
+        scheme = {"name": f"Scheme {i}", "max_income": rng.choice([100000, 200000, 300000, 500000])}
+        if rng.random() < 0.7:
+            scheme["min_age"] = rng.randint(0, 60)
+        if rng.random() < 0.5:
+            scheme["max_age"] = rng.randint(18, 90)
+        if rng.random() < 0.6:
+            scheme["states"] = rng.sample(STATES, rng.randint(1, 3))
+        schemes.append(scheme)
+    return schemes
+
+
+def run_load(source, binary, mode):
+    out = subprocess.run(
+        [sys.executable, "-c", LOAD, source, binary, mode],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    ).stdout.split()
+    return out[0], float(out[1]), int(out[2])
+
+
+def load(source, binary, runs):
+    """
+    (source, best seconds, bytes left on the Python heap), each from
+    fresh interpreters; the heap is traced in a separate, untimed run.
+    """
+    kind = None
+    best = float("inf")
+    for _ in range(runs):
+        kind, seconds, _ = run_load(source, binary, "time")
+        best = min(best, seconds)
+    _, _, heap = run_load(source, binary, "heap")
+    return kind, best, heap
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'schemes':>8} {'json ms':>9} {'binary ms':>10} {'json heap MB':>13} {'binary heap MB':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            source = os.path.join(tmp, f"schemes_{size}.json")
+            binary = os.path.join(tmp, f"schemes_{size}.bin")
+            with open(source, "w", encoding="utf-8") as f:
+                json.dump(make_catalog(size), f)
+
+            _, json_s, json_heap = load(source, binary, args.runs)
+            compile_file(source, binary)
+            kind, binary_s, binary_heap = load(source, binary, args.runs)
+            assert kind == "binary", "compiled catalog was not used"
+
+            print(f"{size:8d} {json_s * 1000:9.1f} {binary_s * 1000:10.2f} "
+                  f"{json_heap / 2 ** 20:13.2f} {binary_heap / 2 ** 20:15.2f}")
+
+
+if __name__ == "__main__":
+    main()
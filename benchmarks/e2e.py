@@ -0,0 +1,267 @@
+"""
+Offline end-to-end benchmark: N simulated callers run scripted
+conversations through async_agent_loop concurrently, with fake capture,
+STT, planner and TTS backends in place of the microphone, Google STT,
+Gemini and gTTS/playback.
+
+Fixtures are a JSON list of conversations. "turns" are the caller's
+replies in order; "answers" maps a profile field to the replies given
+when the agent asks for it (the agent picks the question order). Each
+reply is a transcript, or {"wav": path, "text": transcript} to replay a
+recorded 16 kHz WAV as the captured audio. An empty transcript is a
+turn the recognizer fails on. A reply with "slots" is one the local
+rules are unsure of: it goes through planner.planner, and the fake
+Gemini answers with those slots after the --llm-ms latency.
+
+Backend latencies are configurable; --speedup divides every simulated
+duration so a full run of long calls finishes quickly.
+
+    python -m benchmarks.e2e --callers 50 --speedup 10
+    python -m benchmarks.e2e --callers 200 --max-turn-ttfa-ms 150
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import planner
+from async_agent import async_agent_loop, run_blocking
+from audio_input import SAMPLE_RATE
+from fakes import FakeGeminiClient, FaultInjector
+from prompts import FIELD_PROMPTS
+from session_server import RemoteClip
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "conversations.json")
+
+# Prompt text -> the profile field it asks for
+PROMPT_FIELDS = {text: field for field, texts in FIELD_PROMPTS.items() for text in texts}
+
+
+class Latencies:
+    """Simulated backend timings in seconds (before --speedup)."""
+
+    def __init__(self, tts=0.4, chars_per_second=15.0, user_speech=1.5, stt=0.6, llm=0.8,
+                 jitter=0.2, speedup=1.0):
+        self.tts = tts
+        self.chars_per_second = chars_per_second
+        self.user_speech = user_speech
+        self.stt = stt
+        self.llm = llm
+        self.jitter = jitter
+        self.speedup = speedup
+
+    def sample(self, seconds):
+        return max(0.0, seconds * random.uniform(1 - self.jitter, 1 + self.jitter)) / self.speedup
+
+
+# ================= FAKE BACKENDS =================
+# Blocking, like the real ones, so they contend for the shared executor.
+
+def fake_synthesize(text, latencies):
+    """TTS round trip; returns the playback duration of the clip."""
+    time.sleep(latencies.sample(latencies.tts))
+    return len(text) / latencies.chars_per_second / latencies.speedup
+
+
+def fake_record_audio(turn, latencies):
+    """The caller speaking: WAV fixture duration, or user_speech seconds of silence."""
+    if isinstance(turn, dict) and turn.get("wav"):
+        from scipy.io.wavfile import read
+        _, audio = read(turn["wav"])
+        time.sleep(len(audio) / SAMPLE_RATE / latencies.speedup)
+        return audio
+
+    seconds = latencies.sample(latencies.user_speech)
+    time.sleep(seconds)
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+def fake_speech_to_text(audio, language, transcript, latencies):
+    time.sleep(latencies.sample(latencies.stt))
+    if not transcript:
+        return {
+            "success": False,
+            "error": "No speech detected"
+        }
+    return {
+        "success": True,
+        "text": transcript,
+        "language": language,
+        "confidence": 0.9
+    }
+
+
+def fixture_slots(scripts):
+    """Lowercased transcript -> the slots the fake Gemini extracts from it."""
+    slots = {}
+    for script in scripts:
+        replies = script["turns"] + [reply for replies in script.get("answers", {}).values() for reply in replies]
+        for reply in replies:
+            if isinstance(reply, dict) and "slots" in reply:
+                slots[reply["text"].lower()] = reply["slots"]
+    return slots
+
+
+def install_fake_planner(scripts, latencies):
+    """Planner LLM calls hit a fake Gemini with the configured latency that reads the fixture slots."""
+    slots = fixture_slots(scripts)
+
+    def plan(contents):
+        said = contents.split("User said:", 1)[1].split("Return JSON", 1)[0].strip()
+        return {
+            "intent": "check_eligibility",
+            "slots": slots.get(said, {}),
+            "next_action": "ask_user",
+            "question": ""
+        }
+
+    low = latencies.llm * (1 - latencies.jitter) / latencies.speedup
+    high = latencies.llm * (1 + latencies.jitter) / latencies.speedup
+    planner.client = FakeGeminiClient(FaultInjector(latency=(low, high)), plan=plan)
+
+
+# ================= SIMULATED CALLER =================
+
+class SimulatedCaller:
+    """io for async_agent_loop that plays one scripted conversation and times it."""
+
+    def __init__(self, script, latencies):
+        self.name = script["name"]
+        self.turns = list(script["turns"])
+        self.answers = {field: list(replies) for field, replies in script.get("answers", {}).items()}
+        self._asked_field = None
+        self.latencies = latencies
+        self.started_at = time.perf_counter()
+        self.first_audio_at = None
+        self.finished_at = None
+        self.turn_ttfa = []
+        self.turns_done = 0
+        self._answered_at = None
+
+    async def speak(self, text, language, arm_lead=None):
+        self._asked_field = PROMPT_FIELDS.get(text)
+        duration = await run_blocking(fake_synthesize, text, self.latencies)
+
+        now = time.perf_counter()
+        if self.first_audio_at is None:
+            self.first_audio_at = now
+        if self._answered_at is not None:
+            # Caller stopped talking -> agent's next audio starts
+            self.turn_ttfa.append(now - self._answered_at)
+            self._answered_at = None
+
+        clip = RemoteClip(duration)
+        wait = duration if arm_lead is None else duration - arm_lead
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return clip
+
+    async def listen(self, filename, language, prompt_clip=None):
+        if prompt_clip:
+            await asyncio.sleep(prompt_clip.remaining_seconds)
+
+        replies = self.answers.get(self._asked_field) if self._asked_field else self.turns
+        turn = replies.pop(0) if replies else ""
+        transcript = turn.get("text", "") if isinstance(turn, dict) else turn
+
+        audio = await run_blocking(fake_record_audio, turn, self.latencies)
+        result = await run_blocking(fake_speech_to_text, audio, language, transcript, self.latencies)
+
+        self._answered_at = time.perf_counter()
+        self.turns_done += 1
+        return result
+
+    async def run(self):
+        result = await async_agent_loop(self)
+        self.finished_at = time.perf_counter()
+        return result
+
+
+# ================= REPORT =================
+
+def _percentiles(values):
+    if not values:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0}
+    ordered = sorted(values)
+    pick = lambda q: ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+    return {"p50": pick(0.50) * 1000, "p95": pick(0.95) * 1000, "p99": pick(0.99) * 1000}
+
+
+def report(callers, wall_seconds):
+    turns = sum(c.turns_done for c in callers)
+    return {
+        "callers": len(callers),
+        "wall_s": wall_seconds,
+        "turns": turns,
+        "turns_per_s": turns / wall_seconds,
+        "llm_calls": planner.planner_stats()["llm_calls"],
+        "call_duration_ms": _percentiles([c.finished_at - c.started_at for c in callers]),
+        "call_ttfa_ms": _percentiles([c.first_audio_at - c.started_at for c in callers]),
+        "turn_ttfa_ms": _percentiles([t for c in callers for t in c.turn_ttfa])
+    }
+
+
+def print_report(stats):
+    print(f"{stats['callers']} callers, {stats['turns']} turns in {stats['wall_s']:.2f}s "
+          f"({stats['turns_per_s']:.1f} turns/s, {stats['llm_calls']} planner LLM calls)")
+    print(f"{'metric':20} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for key, label in [("call_ttfa_ms", "call TTFA"), ("turn_ttfa_ms", "turn TTFA"),
+                       ("call_duration_ms", "call duration")]:
+        p = stats[key]
+        print(f"{label:20} {p['p50']:9.1f} {p['p95']:9.1f} {p['p99']:9.1f}")
+
+
+async def run(scripts, callers, latencies):
+    simulated = [SimulatedCaller(scripts[i % len(scripts)], latencies) for i in range(callers)]
+    start = time.perf_counter()
+    await asyncio.gather(*(caller.run() for caller in simulated))
+    return report(simulated, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURES)
+    parser.add_argument("--callers", type=int, default=20, help="concurrent simulated callers")
+    parser.add_argument("--speedup", type=float, default=10.0, help="divides every simulated duration")
+    parser.add_argument("--tts-ms", type=float, default=400)
+    parser.add_argument("--stt-ms", type=float, default=600)
+    parser.add_argument("--llm-ms", type=float, default=800)
+    parser.add_argument("--user-speech-ms", type=float, default=1500)
+    parser.add_argument("--chars-per-second", type=float, default=15.0, help="simulated playback speed")
+    parser.add_argument("--jitter", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    parser.add_argument("--max-turn-ttfa-ms", type=float,
+                        help="exit non-zero if p95 turn TTFA (at --speedup) exceeds this")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    with open(args.fixtures, "r", encoding="utf-8") as f:
+        scripts = json.load(f)
+
+    latencies = Latencies(
+        tts=args.tts_ms / 1000, chars_per_second=args.chars_per_second,
+        user_speech=args.user_speech_ms / 1000, stt=args.stt_ms / 1000, llm=args.llm_ms / 1000,
+        jitter=args.jitter, speedup=args.speedup
+    )
+    install_fake_planner(scripts, latencies)
+
+    stats = asyncio.run(run(scripts, args.callers, latencies))
+    if args.json:
+        print(json.dumps(stats, indent=2))
+    else:
+        print_report(stats)
+
+    if args.max_turn_ttfa_ms is not None and stats["turn_ttfa_ms"]["p95"] > args.max_turn_ttfa_ms:
+        print(f"❌ p95 turn TTFA {stats['turn_ttfa_ms']['p95']:.1f} ms exceeds {args.max_turn_ttfa_ms} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
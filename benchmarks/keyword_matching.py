@@ -0,0 +1,73 @@
+"""
+Microbenchmark: the precompiled keyword automaton against the nested
+`any(alias in text ...)` substring loops it replaced, on synthetic
+transcripts mentioning states and languages in every script.
+
+    python -m benchmarks.keyword_matching --transcripts 5000
+"""
+import argparse
+import random
+import time
+
+from keyword_matcher import KeywordMatcher, load_keywords
+
+FILLER = [
+    "मैं", "रहता", "हूँ", "నేను", "ఉంటాను", "நான்", "வசிக்கிறேன்", "আমি", "থাকি",
+    "i", "live", "in", "the", "state", "of", "please", "haan", "ji", "मेरा", "ఊరు"
+]
+
+
+def substring_loop(keywords, text):
+    """The old approach: every alias checked against the whole text."""
+    text = text.lower()
+    for value, aliases in keywords.items():
+        if any(alias in text for alias in aliases):
+            return value
+    return None
+
+
+def make_transcripts(keywords, count, hit_rate=0.8, seed=0):
+    rng = random.Random(seed)
+    aliases = [alias for values in keywords.values() for alias in values]
+    transcripts = []
+    for _ in range(count):
+        words = rng.choices(FILLER, k=rng.randint(4, 12))
+        if rng.random() < hit_rate:
+            words.insert(rng.randrange(len(words) + 1), rng.choice(aliases))
+        transcripts.append(" ".join(words))
+    return transcripts
+
+
+def time_per_call(func, transcripts, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in transcripts:
+            func(text)
+    return (time.perf_counter() - start) / (repeat * len(transcripts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transcripts", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'keywords':10} {'aliases':>8} {'build ms':>9} {'loop us':>9} {'automaton us':>13} {'speedup':>8}")
+    for name in ["states", "languages"]:
+        keywords = load_keywords(name)
+        transcripts = make_transcripts(keywords, args.transcripts)
+
+        start = time.perf_counter()
+        matcher = KeywordMatcher(keywords)
+        build = time.perf_counter() - start
+
+        loop = time_per_call(lambda t: substring_loop(keywords, t), transcripts, args.repeat)
+        automaton = time_per_call(lambda t: matcher.first(t, fuzzy=False), transcripts, args.repeat)
+
+        aliases = sum(len(v) for v in keywords.values())
+        print(f"{name:10} {aliases:8d} {build * 1000:9.1f} {loop * 1e6:9.1f} "
+              f"{automaton * 1e6:13.1f} {loop / automaton:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
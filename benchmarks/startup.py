@@ -0,0 +1,73 @@
+"""
+Cold import time of each entry point, measured with `python -X importtime`
+in a fresh interpreter with no credentials in the environment.
+
+    python -m benchmarks.startup --runs 5 --top 10
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ENTRY_POINTS = ["agent_loop", "async_agent", "session_server", "planner", "stt", "tts", "audio_input"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Imports must succeed without credentials
+SECRET_VARS = ("GEMINI_API_KEY", "GOOGLE_APPLICATION_CREDENTIALS")
+
+
+def parse_importtime(stderr):
+    """(module, self_us, cumulative_us) rows from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def measure(module):
+    """Imports module in a fresh interpreter. Returns (cumulative_us, rows) or raises."""
+    env = {k: v for k, v in os.environ.items() if k not in SECRET_VARS}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    rows = parse_importtime(proc.stderr)
+    total = next(c for name, _, c in reversed(rows) if name == module)
+    return total, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=5, help="slowest imports to list per entry point")
+    args = parser.parse_args()
+
+    print(f"{'entry point':16} {'median ms':>10} {'min ms':>8}")
+    for module in args.modules:
+        try:
+            results = [measure(module) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{module:16} ❌ {e}")
+            continue
+
+        totals = [total for total, _ in results]
+        print(f"{module:16} {statistics.median(totals) / 1000:10.1f} {min(totals) / 1000:8.1f}")
+
+        if args.top:
+            _, rows = results[-1]
+            slowest = sorted(rows, key=lambda row: row[1], reverse=True)[:args.top]
+            for name, self_us, _ in slowest:
+                print(f"    {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+CPU-only benchmark: sequential AI4BharatSTT.process_audio vs. the
+micro-batching server under concurrent load.
+
+    python -m benchmarks.stt_batching audio/*.wav --concurrency 16
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scipy.io.wavfile import read
+
+from stt_handler import AI4BharatSTT
+from stt_batcher import BatchingSTTServer, MAX_BATCH_SIZE, MAX_WAIT_MS
+
+
+def load_fixtures(paths):
+    return [read(path)[1] for path in paths]
+
+
+def run_sequential(stt, audios):
+    start = time.perf_counter()
+    for audio in audios:
+        stt.process_audio(audio)
+    return time.perf_counter() - start
+
+
+def run_batched(server, audios, concurrency):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(server.process_audio, audios))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wavs", nargs="+", help="16 kHz mono WAV fixtures")
+    parser.add_argument("--model", default="ai4bharat/indicwhisper-hindi")
+    parser.add_argument("--repeat", type=int, default=4, help="times each fixture is submitted")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=MAX_BATCH_SIZE)
+    parser.add_argument("--wait-ms", type=int, default=MAX_WAIT_MS)
+    args = parser.parse_args()
+
+    audios = load_fixtures(args.wavs) * args.repeat
+    stt = AI4BharatSTT(args.model, device="cpu")
+
+    # Warm-up pass so model initialization is not measured
+    stt.process_audio(audios[0])
+
+    sequential = run_sequential(stt, audios)
+    print(f"sequential: {len(audios)} utterances in {sequential:.2f}s "
+          f"({len(audios) / sequential:.2f}/s)")
+
+    server = BatchingSTTServer(stt, args.batch_size, args.wait_ms)
+    batched = run_batched(server, audios, args.concurrency)
+    metrics = server.metrics()
+    server.close()
+
+    print(f"batched:    {len(audios)} utterances in {batched:.2f}s "
+          f"({len(audios) / batched:.2f}/s, speedup {sequential / batched:.2f}x)")
+    for key, value in metrics.items():
+        print(f"  {key:18} {value:.2f}" if isinstance(value, float) else f"  {key:18} {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import json
+import random
+import threading
+import time
+from types import SimpleNamespace
+
+
+# ================= FAULT INJECTION =================
+
+class FaultInjector:
+    """
+    Latency and error profile for a fake backend.
+    latency: (min, max) seconds for a normal call
+    error_rate: share of calls that raise ConnectionError
+    slow_rate: share of calls that take slow_latency seconds (tail latency)
+    """
+
+    def __init__(self, latency=(0.05, 0.2), error_rate=0.0, slow_rate=0.0, slow_latency=5.0, seed=None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.calls = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            delay = self._random.uniform(*self.latency)
+            if roll < self.error_rate:
+                self.errors += 1
+
+        if roll < self.error_rate:
+            time.sleep(delay / 2)
+            raise ConnectionError("Injected backend error")
+        if roll < self.error_rate + self.slow_rate:
+            delay = self.slow_latency
+        time.sleep(delay)
+
+
+# ================= FAKE CLIENTS =================
+
+class FakeGeminiClient:
+    """
+    Stands in for genai.Client: planner.client = FakeGeminiClient(...).
+    plan is the JSON the model answers with, or a function of the prompt
+    that returns it.
+    """
+
+    def __init__(self, faults=None, plan=None):
+        self.faults = faults or FaultInjector()
+        self.plan = plan or {
+            "intent": "check_eligibility",
+            "missing_fields": ["age", "income", "state"],
+            "next_action": "ask_user",
+            "question": "आपकी उम्र क्या है?"
+        }
+        self.models = SimpleNamespace(generate_content=self.generate_content)
+
+    def generate_content(self, model, contents):
+        self.faults()
+        plan = self.plan(contents) if callable(self.plan) else self.plan
+        return SimpleNamespace(text=json.dumps(plan, ensure_ascii=False))
+
+
+class FakeSpeechClient:
+    """Stands in for speech.SpeechClient: stt.client = FakeSpeechClient(...)."""
+
+    def __init__(self, faults=None, transcript="मेरी उम्र पैंतीस साल है", confidence=0.9):
+        self.faults = faults or FaultInjector()
+        self.transcript = transcript
+        self.confidence = confidence
+
+    def recognize(self, config, audio):
+        self.faults()
+        alternative = SimpleNamespace(transcript=self.transcript, confidence=self.confidence)
+        return SimpleNamespace(results=[SimpleNamespace(alternatives=[alternative])])
+
+
+# 🧪 TEST
+if __name__ == "__main__":
+    from resilience import ResilientClient
+
+    faults = FaultInjector(error_rate=0.2, slow_rate=0.05, slow_latency=2.0, seed=7)
+    gemini = FakeGeminiClient(faults)
+    caller = ResilientClient("fake-gemini", deadline=1.0, retries=2, hedge_min_samples=10)
+
+    ok = failed = 0
+    start = time.perf_counter()
+    for _ in range(100):
+        try:
+            caller.call(gemini.models.generate_content, model="fake", contents="")
+            ok += 1
+        except Exception:
+            failed += 1
+
+    print(f"✅ {ok} ok, ❌ {failed} failed in {time.perf_counter() - start:.1f}s")
+    print(f"Backend calls: {faults.calls}, injected errors: {faults.errors}, circuit: {caller.breaker.state}")
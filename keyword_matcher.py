@@ -0,0 +1,325 @@
+import json
+import os
+import re
+import unicodedata
+from collections import deque
+from typing import NamedTuple
+
+KEYWORD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "keywords")
+
+# Keywords at least this long may carry a suffix ("తెలంగాణలో", "हिंदीमध्ये");
+# shorter ones ("हाँ", "ना", "ha") must be whole words.
+SUFFIX_MIN_LENGTH = 4
+
+# Keywords at least this long (spaces excluded) also match with one
+# inserted, deleted, substituted or transposed character.
+FUZZY_MIN_LENGTH = 5
+
+
+class Match(NamedTuple):
+    start: int      # span in the NFC-normalized input text
+    end: int
+    value: str      # canonical value, e.g. "telangana" or "yes"
+    keyword: str    # normalized keyword that matched
+    distance: int   # 0 for exact matches, 1 for fuzzy ones
+
+
+# ================= NORMALIZATION =================
+
+class _CharTable(dict):
+    """str.translate table filled in on first sight of each character."""
+
+    def __missing__(self, codepoint):
+        ch = chr(codepoint)
+        category = unicodedata.category(ch)
+        if category == "Cf":
+            replacement = ""
+        elif category[0] in "PSZC":
+            replacement = " "
+        else:
+            replacement = ch.lower()
+        self[codepoint] = replacement
+        return replacement
+
+
+_CHAR_TABLE = _CharTable()
+
+
+def normalize_with_offsets(text):
+    """
+    NFC, lowercase, format characters (ZWJ/ZWNJ) dropped, punctuation and
+    whitespace runs collapsed to one space. Returns (normalized, offsets)
+    where offsets[i] is the index in NFC(text) of normalized[i], or None
+    when the two line up one to one (the common case).
+    """
+    if not unicodedata.is_normalized("NFC", text):
+        text = unicodedata.normalize("NFC", text)
+
+    normalized = text.translate(_CHAR_TABLE)
+    if len(normalized) == len(text) and "  " not in normalized:
+        return normalized, None
+
+    chars = []
+    offsets = []
+    for i, ch in enumerate(text):
+        for out in _CHAR_TABLE[ord(ch)]:
+            if out == " " and (not chars or chars[-1] == " "):
+                continue
+            chars.append(out)
+            offsets.append(i)
+    return "".join(chars), offsets
+
+
+def normalize_keyword(keyword):
+    return normalize_with_offsets(keyword)[0].strip()
+
+
+def _edit_distance_at_most_one(a, b):
+    """True if a and b differ by at most one edit or one adjacent transposition."""
+    if a == b:
+        return True
+    la, lb = len(a), len(b)
+    if abs(la - lb) > 1:
+        return False
+    i = 0
+    while i < min(la, lb) and a[i] == b[i]:
+        i += 1
+    if la == lb:
+        # One substitution, or two neighbours swapped
+        if a[i + 1:] == b[i + 1:]:
+            return True
+        return a[i:i + 2] == b[i + 1:i + 2] + b[i:i + 1] and a[i + 2:] == b[i + 2:]
+    if la > lb:
+        return a[i + 1:] == b[i:]
+    return a[i:] == b[i + 1:]
+
+
+# ================= AUTOMATON =================
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over normalized keywords, built once.
+    keywords: {value: [aliases, ...]}; multi-word aliases also match
+    written without spaces.
+
+    find_all() walks the automaton for every overlapping match. find()
+    and first() only need leftmost-longest matches, so they run the same
+    trie compiled into one regular expression, which scans in C.
+    """
+
+    def __init__(self, keywords, fuzzy=True):
+        self._goto = [{}]
+        self._fail = [0]
+        self._outputs = [[]]
+        self._terminal = {}     # trie node -> pattern id ending there
+        self._patterns = []     # (keyword, value)
+        self._fuzzy_index = {}  # deletion variant -> pattern ids
+        self.max_words = 1
+
+        for value, aliases in keywords.items():
+            for alias in aliases:
+                keyword = normalize_keyword(alias)
+                if not keyword:
+                    continue
+                self._add(keyword, value)
+                if " " in keyword:
+                    self._add(keyword.replace(" ", ""), value)
+
+        self._regex = re.compile("(?<![^ ])" + self._trie_pattern(0))
+        self._build_failure_links()
+        if fuzzy:
+            self._build_fuzzy_index()
+
+    @classmethod
+    def from_file(cls, name, fuzzy=True):
+        """Matcher for keywords/<name>.json."""
+        return cls(load_keywords(name), fuzzy)
+
+    def _add(self, keyword, value):
+        if any(k == keyword and v == value for k, v in self._patterns):
+            return
+        node = 0
+        for ch in keyword:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._outputs.append([])
+            node = nxt
+        self._outputs[node].append(len(self._patterns))
+        self._terminal.setdefault(node, len(self._patterns))
+        self._patterns.append((keyword, value))
+        self.max_words = max(self.max_words, keyword.count(" ") + 1)
+
+    def _trie_pattern(self, node):
+        """
+        Regex for the subtrie at node. Longer continuations come before the
+        keyword ending here, so the regex prefers the longest keyword.
+        """
+        branches = [
+            re.escape(ch) + self._trie_pattern(child)
+            for ch, child in sorted(self._goto[node].items())
+        ]
+        if node in self._terminal:
+            keyword = self._patterns[self._terminal[node]][0]
+            whole_word = len(keyword) < SUFFIX_MIN_LENGTH or keyword.isascii()
+            branches.append("(?![^ ])" if whole_word else "")
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[child] = self._goto[fail].get(ch, 0)
+                self._outputs[child] = self._outputs[child] + self._outputs[self._fail[child]]
+
+    def _build_fuzzy_index(self):
+        for pid, (keyword, _) in enumerate(self._patterns):
+            if len(keyword.replace(" ", "")) < FUZZY_MIN_LENGTH:
+                continue
+            for variant in {keyword} | _deletions(keyword):
+                self._fuzzy_index.setdefault(variant, set()).add(pid)
+
+    # ---- matching ----
+
+    def find_all(self, text):
+        """Every exact keyword occurrence (overlaps included), in one pass."""
+        normalized, offsets = normalize_with_offsets(text)
+        return [
+            self._match(offsets, start, end, pid, 0)
+            for start, end, pid in self._scan(normalized)
+        ]
+
+    def _scan(self, normalized):
+        goto, fail, outputs, patterns = self._goto, self._fail, self._outputs, self._patterns
+        length = len(normalized)
+        node = 0
+        for i, ch in enumerate(normalized):
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            for pid in outputs[node]:
+                keyword = patterns[pid][0]
+                start = i + 1 - len(keyword)
+                end = i + 1
+                if start > 0 and normalized[start - 1] != " ":
+                    continue
+                if end < length and normalized[end] != " " and (
+                        len(keyword) < SUFFIX_MIN_LENGTH or keyword.isascii()):
+                    continue
+                yield start, end, pid
+
+    def _match(self, offsets, start, end, pid, distance):
+        keyword, value = self._patterns[pid]
+        if offsets is None:
+            return Match(start, end, value, keyword, distance)
+        return Match(offsets[start], offsets[end - 1] + 1, value, keyword, distance)
+
+    def find(self, text, fuzzy=True):
+        """
+        Leftmost-longest, non-overlapping matches. If there is no exact
+        match, word windows within one edit of a keyword are returned.
+        """
+        normalized, offsets = normalize_with_offsets(text)
+        matches = [
+            self._match(offsets, m.start(), m.end(), self._pattern_id(m.group()), 0)
+            for m in self._regex.finditer(normalized)
+        ]
+
+        if not matches and fuzzy and self._fuzzy_index:
+            matches = self._fuzzy(normalized, offsets)
+        return matches
+
+    def _pattern_id(self, keyword):
+        node = 0
+        for ch in keyword:
+            node = self._goto[node][ch]
+        return self._terminal[node]
+
+    def first(self, text, fuzzy=True):
+        """Value of the leftmost match, or None."""
+        matches = self.find(text, fuzzy)
+        return matches[0].value if matches else None
+
+    def _fuzzy(self, normalized, offsets):
+        words = []
+        position = 0
+        for word in normalized.split(" "):
+            if word:
+                words.append((position, position + len(word)))
+            position += len(word) + 1
+
+        matches = []
+        last_end = -1
+        for i in range(len(words)):
+            if words[i][0] < last_end:
+                continue
+            best = None
+            # Longest window first, so "tamil nadu" wins over "tamil"
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                start, end = words[i][0], words[i + n - 1][1]
+                window = normalized[start:end]
+                pid = self._fuzzy_lookup(window)
+                if pid is not None:
+                    best = (start, end, pid)
+                    break
+            if best:
+                matches.append(self._match(offsets, best[0], best[1], best[2], 1))
+                last_end = best[1]
+        return matches
+
+    def _fuzzy_lookup(self, window):
+        if len(window.replace(" ", "")) < FUZZY_MIN_LENGTH - 1:
+            return None
+        candidates = set()
+        for variant in (window, *_deletions(window)):
+            candidates |= self._fuzzy_index.get(variant, set())
+        for pid in sorted(candidates):
+            if _edit_distance_at_most_one(window, self._patterns[pid][0]):
+                return pid
+        return None
+
+
+def _deletions(word):
+    return {word[:i] + word[i + 1:] for i in range(len(word))}
+
+
+# ================= DATA =================
+
+def load_keywords(name):
+    with open(os.path.join(KEYWORD_DIR, f"{name}.json"), "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+_matchers = {}
+
+
+def get_matcher(name, language=None):
+    """
+    Shared matcher for keywords/<name>.json, built on first use.
+    language selects one section of per-language files (yes_no.json).
+    """
+    key = (name, language)
+    if key not in _matchers:
+        keywords = load_keywords(name)
+        if language is not None:
+            keywords = keywords[language]
+        _matchers[key] = KeywordMatcher(keywords)
+    return _matchers[key]
+
+
+# 🧪 TEST
+if __name__ == "__main__":
+    states = get_matcher("states")
+    for text in ["నేను తెలంగాణలో ఉంటాను", "I live in Tamil Nadu.", "मैं उत्तरप्रदेश से हूँ",
+                 "from telangaana", "మహారాష్ట", "pondicherry and delhi"]:
+        print(text, "->", states.find(text))
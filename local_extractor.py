@@ -0,0 +1,334 @@
+import re
+import unicodedata
+
+from prompts import field_prompt
+from keyword_matcher import get_matcher, load_keywords
+
+# ================= NUMBER WORDS =================
+# Spoken numbers in the five supported languages plus romanized / English
+# forms. Multipliers (100 and up) scale the number spoken before them.
+
+NUMBER_WORDS = {
+    "en": {
+        "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+        "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10,
+        "eleven": 11, "twelve": 12, "thirteen": 13, "fourteen": 14, "fifteen": 15,
+        "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+        "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+        "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+        "hundred": 100, "sau": 100, "thousand": 1000, "hazar": 1000, "hajar": 1000,
+        "hazaar": 1000, "lakh": 100000, "lakhs": 100000, "lac": 100000,
+        "crore": 10000000, "crores": 10000000
+    },
+    "hi": {
+        "शून्य": 0, "एक": 1, "दो": 2, "तीन": 3, "चार": 4, "पांच": 5, "पाँच": 5,
+        "छह": 6, "छः": 6, "छे": 6, "सात": 7, "आठ": 8, "नौ": 9, "दस": 10,
+        "ग्यारह": 11, "बारह": 12, "तेरह": 13, "चौदह": 14, "पंद्रह": 15, "पन्द्रह": 15,
+        "सोलह": 16, "सत्रह": 17, "अठारह": 18, "उन्नीस": 19, "बीस": 20,
+        "इक्कीस": 21, "बाईस": 22, "तेईस": 23, "चौबीस": 24, "पच्चीस": 25,
+        "छब्बीस": 26, "सत्ताईस": 27, "अट्ठाईस": 28, "उनतीस": 29, "तीस": 30,
+        "इकतीस": 31, "बत्तीस": 32, "तैंतीस": 33, "चौंतीस": 34, "पैंतीस": 35,
+        "छत्तीस": 36, "सैंतीस": 37, "अड़तीस": 38, "उनतालीस": 39, "चालीस": 40,
+        "इकतालीस": 41, "बयालीस": 42, "तैंतालीस": 43, "चवालीस": 44, "पैंतालीस": 45,
+        "छियालीस": 46, "सैंतालीस": 47, "अड़तालीस": 48, "उनचास": 49, "पचास": 50,
+        "इक्यावन": 51, "बावन": 52, "तिरपन": 53, "चौवन": 54, "पचपन": 55,
+        "छप्पन": 56, "सत्तावन": 57, "अट्ठावन": 58, "उनसठ": 59, "साठ": 60,
+        "इकसठ": 61, "बासठ": 62, "तिरसठ": 63, "चौंसठ": 64, "पैंसठ": 65,
+        "छियासठ": 66, "सड़सठ": 67, "अड़सठ": 68, "उनहत्तर": 69, "सत्तर": 70,
+        "इकहत्तर": 71, "बहत्तर": 72, "तिहत्तर": 73, "चौहत्तर": 74, "पचहत्तर": 75,
+        "छिहत्तर": 76, "सतहत्तर": 77, "अठहत्तर": 78, "उन्यासी": 79, "अस्सी": 80,
+        "इक्यासी": 81, "बयासी": 82, "तिरासी": 83, "चौरासी": 84, "पचासी": 85,
+        "छियासी": 86, "सत्तासी": 87, "अट्ठासी": 88, "नवासी": 89, "नब्बे": 90,
+        "इक्यानबे": 91, "बानबे": 92, "तिरानबे": 93, "चौरानबे": 94, "पंचानबे": 95,
+        "छियानबे": 96, "सत्तानबे": 97, "अट्ठानबे": 98, "निन्यानबे": 99,
+        "सौ": 100, "हज़ार": 1000, "हजार": 1000, "लाख": 100000, "करोड़": 10000000
+    },
+    "mr": {
+        "शून्य": 0, "एक": 1, "दोन": 2, "तीन": 3, "चार": 4, "पाच": 5, "सहा": 6,
+        "सात": 7, "आठ": 8, "नऊ": 9, "दहा": 10, "अकरा": 11, "बारा": 12,
+        "तेरा": 13, "चौदा": 14, "पंधरा": 15, "सोळा": 16, "सतरा": 17, "अठरा": 18,
+        "एकोणीस": 19, "वीस": 20, "एकवीस": 21, "बावीस": 22, "तेवीस": 23,
+        "चोवीस": 24, "पंचवीस": 25, "सव्वीस": 26, "सत्तावीस": 27, "अठ्ठावीस": 28,
+        "एकोणतीस": 29, "तीस": 30, "पस्तीस": 35, "चाळीस": 40, "पंचेचाळीस": 45,
+        "पन्नास": 50, "पंचावन्न": 55, "साठ": 60, "पासष्ट": 65, "सत्तर": 70,
+        "पंचाहत्तर": 75, "ऐंशी": 80, "नव्वद": 90,
+        "शंभर": 100, "हजार": 1000, "लाख": 100000, "कोटी": 10000000
+    },
+    "te": {
+        "సున్నా": 0, "ఒకటి": 1, "ఒక": 1, "రెండు": 2, "మూడు": 3, "నాలుగు": 4,
+        "ఐదు": 5, "ఆరు": 6, "ఏడు": 7, "ఎనిమిది": 8, "తొమ్మిది": 9, "పది": 10,
+        "పదకొండు": 11, "పన్నెండు": 12, "పదమూడు": 13, "పద్నాలుగు": 14,
+        "పదిహేను": 15, "పదహారు": 16, "పదిహేడు": 17, "పద్దెనిమిది": 18,
+        "పంతొమ్మిది": 19, "ఇరవై": 20, "ముప్పై": 30, "నలభై": 40, "యాభై": 50,
+        "అరవై": 60, "డెబ్బై": 70, "ఎనభై": 80, "తొంభై": 90,
+        "వంద": 100, "వందల": 100, "నూరు": 100, "వెయ్యి": 1000, "వేలు": 1000,
+        "వేల": 1000, "లక్ష": 100000, "లక్షలు": 100000, "లక్షల": 100000,
+        "కోటి": 10000000, "కోట్లు": 10000000
+    },
+    "ta": {
+        "பூஜ்யம்": 0, "ஒன்று": 1, "ஒரு": 1, "இரண்டு": 2, "மூன்று": 3,
+        "நான்கு": 4, "ஐந்து": 5, "ஆறு": 6, "ஏழு": 7, "எட்டு": 8, "ஒன்பது": 9,
+        "பத்து": 10, "பதினொன்று": 11, "பன்னிரண்டு": 12, "பதின்மூன்று": 13,
+        "பதினான்கு": 14, "பதினைந்து": 15, "பதினாறு": 16, "பதினேழு": 17,
+        "பதினெட்டு": 18, "பத்தொன்பது": 19,
+        "இருபது": 20, "இருபத்தி": 20, "இருபத்து": 20,
+        "முப்பது": 30, "முப்பத்தி": 30, "முப்பத்து": 30,
+        "நாற்பது": 40, "நாற்பத்தி": 40, "நாற்பத்து": 40,
+        "ஐம்பது": 50, "ஐம்பத்தி": 50, "ஐம்பத்து": 50,
+        "அறுபது": 60, "அறுபத்தி": 60, "அறுபத்து": 60,
+        "எழுபது": 70, "எழுபத்தி": 70, "எழுபத்து": 70,
+        "எண்பது": 80, "எண்பத்தி": 80, "எண்பத்து": 80,
+        "தொண்ணூறு": 90, "தொண்ணூற்றி": 90, "தொண்ணூற்று": 90,
+        "நூறு": 100, "ஆயிரம்": 1000, "லட்சம்": 100000, "கோடி": 10000000
+    },
+    "bn": {
+        "শূন্য": 0, "এক": 1, "দুই": 2, "তিন": 3, "চার": 4, "পাঁচ": 5, "ছয়": 6,
+        "সাত": 7, "আট": 8, "নয়": 9, "দশ": 10, "এগারো": 11, "বারো": 12,
+        "তেরো": 13, "চোদ্দ": 14, "পনেরো": 15, "ষোল": 16, "সতেরো": 17,
+        "আঠারো": 18, "উনিশ": 19, "বিশ": 20, "কুড়ি": 20, "একুশ": 21, "বাইশ": 22,
+        "তেইশ": 23, "চব্বিশ": 24, "পঁচিশ": 25, "ছাব্বিশ": 26, "সাতাশ": 27,
+        "আঠাশ": 28, "ঊনত্রিশ": 29, "ত্রিশ": 30, "তিরিশ": 30, "পঁয়ত্রিশ": 35,
+        "চল্লিশ": 40, "পঁয়তাল্লিশ": 45, "পঞ্চাশ": 50, "পঞ্চান্ন": 55, "ষাট": 60,
+        "পঁয়ষট্টি": 65, "সত্তর": 70, "পঁচাত্তর": 75, "আশি": 80, "নব্বই": 90,
+        "শো": 100, "একশো": 100, "হাজার": 1000, "লাখ": 100000, "কোটি": 10000000
+    }
+}
+
+# Counts with a built-in half: "ढाई लाख" -> 250000, "डेढ़ सौ" -> 150
+FRACTION_WORDS = {
+    "hi": {"डेढ़": 1.5, "ढाई": 2.5},
+    "mr": {"दीड": 1.5, "अडीच": 2.5},
+    "bn": {"দেড়": 1.5, "আড়াই": 2.5},
+    "te": {"ఒకటిన్నర": 1.5, "రెండున్నర": 2.5},
+    "ta": {"ஒன்றரை": 1.5, "இரண்டரை": 2.5}
+}
+
+# Words that adjust the count after them: "साढ़े तीन लाख" -> 350000,
+# "सवा लाख" -> 125000, "पौने दो सौ" -> 175
+FRACTION_PREFIXES = {
+    "hi": {"साढ़े": 0.5, "सवा": 0.25, "पौने": -0.25},
+    "mr": {"साडे": 0.5, "सव्वा": 0.25, "पावणे": -0.25},
+    "bn": {"সাড়ে": 0.5, "সোয়া": 0.25, "পৌনে": -0.25}
+}
+
+# Answers outside these bounds are not taken on the fast path
+# (e.g. a birth year "1990" given as the age)
+AGE_RANGE = (1, 119)
+
+# ================= STATES =================
+
+# Canonical name -> spellings in every script, for all 36 states and UTs
+STATE_NAMES = load_keywords("states")
+
+# ================= INTENT KEYWORDS =================
+
+ELIGIBILITY_KEYWORDS = [
+    "scheme", "yojana", "eligible", "eligibility",
+    "योजना", "पात्र", "పథకం", "పథకాల", "అర్హత", "திட்டம்", "திட்ட", "தகுதி",
+    "প্রকল্প", "যোগ্য"
+]
+
+# Confidence of a local plan below which the LLM planner is used instead
+FAST_PATH_CONFIDENCE = 0.75
+
+_DIGIT_GROUP_COMMA = re.compile(r"(?<=\d),(?=\d)")
+_DECIMAL_POINT = re.compile(r"(?<=\d)\.(?=\d)")
+_TOKEN = re.compile(r"\d+(?:\.\d+)?|[^\d\s]+")
+
+
+def normalize(text):
+    """
+    NFC, lowercase, digit-group commas removed, punctuation to spaces
+    except decimal points ("1.5 लाख" keeps its 1.5).
+    """
+    text = unicodedata.normalize("NFC", text).lower()
+    text = _DIGIT_GROUP_COMMA.sub("", text)
+    decimals = {m.start() for m in _DECIMAL_POINT.finditer(text)}
+    return "".join(
+        " " if unicodedata.category(ch)[0] in "PSZ" and i not in decimals else ch
+        for i, ch in enumerate(text)
+    )
+
+
+def tokenize(text):
+    # Splits digits from attached script, e.g. "22साल" -> ["22", "साल"]
+    return _TOKEN.findall(normalize(text))
+
+
+def _nfc_keys(words):
+    return {unicodedata.normalize("NFC", w): v for w, v in words.items()}
+
+
+def _number_vocabulary(language):
+    vocabulary = dict(NUMBER_WORDS["en"])
+    vocabulary.update(NUMBER_WORDS.get(language, {}))
+    vocabulary.update(FRACTION_WORDS.get(language, {}))
+    return _nfc_keys(vocabulary), _nfc_keys(FRACTION_PREFIXES.get(language, {}))
+
+
+def _as_number(value):
+    # 1.5 lakh is a whole number of rupees; keep ints where they are exact
+    return int(value) if value == int(value) else value
+
+
+_vocabularies = {}
+
+
+def extract_spoken_numbers(text, language):
+    """
+    Numbers in text, in order: digits in any script (decimals included)
+    plus spoken number words and fractions, e.g. "50 हज़ार" -> 50000,
+    "ఇరవై రెండు" -> 22, "1.5 लाख" -> 150000, "साढ़े तीन लाख" -> 350000.
+    Returns (numbers, used_words) where used_words is True if any number
+    relied on number words rather than digits alone.
+    """
+    if language not in _vocabularies:
+        _vocabularies[language] = _number_vocabulary(language)
+    vocabulary, prefixes = _vocabularies[language]
+
+    numbers = []
+    used_words = False
+    total, current, fraction, in_number = 0, 0, 0, False
+
+    def count():
+        # The count a multiplier scales: "सवा लाख" is 1.25 lakh
+        return (current or 1) + fraction
+
+    def flush():
+        nonlocal total, current, fraction, in_number
+        if in_number:
+            numbers.append(_as_number(total + current + fraction))
+        total, current, fraction, in_number = 0, 0, 0, False
+
+    for token in tokenize(text):
+        if token[0].isdigit():
+            if in_number and current:
+                flush()
+            current += float(token) if "." in token else int(token)
+            in_number = True
+            continue
+
+        if token in prefixes:
+            if in_number and current:
+                flush()
+            used_words = True
+            in_number = True
+            fraction = prefixes[token]
+            continue
+
+        value = vocabulary.get(token)
+        if value is None:
+            flush()
+            continue
+
+        used_words = True
+        in_number = True
+        if value == 100:
+            current = count() * 100
+            fraction = 0
+        elif value >= 1000:
+            total += count() * value
+            current = fraction = 0
+        else:
+            current += value
+
+    flush()
+    return numbers, used_words
+
+
+def extract_state(text):
+    """Canonical state name mentioned in text, or None (tolerates one-letter ASR slips)."""
+    return get_matcher("states").first(text)
+
+
+# ================= SLOT EXTRACTION =================
+
+def extract_field(field, text, language="hi"):
+    """
+    Value for one expected field and the confidence in it.
+    Returns (value, confidence); value is None if nothing was found.
+    """
+    if field == "state":
+        matches = get_matcher("states").find(text)
+        if not matches:
+            return None, 0.0
+        # A near-miss spelling is kept, but left to the LLM on the fast path
+        return matches[0].value, 0.9 if matches[0].distance == 0 else 0.7
+
+    numbers, used_words = extract_spoken_numbers(text, language)
+    if not numbers:
+        return None, 0.0
+
+    # Same rule as agent_loop: with several numbers take the last one
+    value = numbers[-1]
+    confidence = 0.95 if not used_words else 0.85
+    if len(numbers) > 1:
+        confidence -= 0.35
+    if not plausible(field, value):
+        confidence = 0.2
+    return value, confidence
+
+
+def plausible(field, value):
+    """False for values no caller could mean, e.g. an age of 1990."""
+    if field == "state":
+        return isinstance(value, str) and bool(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    if field == "age":
+        return AGE_RANGE[0] <= value <= AGE_RANGE[1]
+    return value > 0
+
+
+def extract(text, language, missing_fields):
+    """
+    Intent and slots for an utterance, answering the first missing field.
+    Returns {"intent", "slots", "confidence"}.
+    """
+    normalized = " ".join(tokenize(text))
+    intent = "check_eligibility" if any(k in normalized for k in ELIGIBILITY_KEYWORDS) else None
+
+    slots = {}
+    confidence = 0.0
+    if missing_fields:
+        value, confidence = extract_field(missing_fields[0], text, language)
+        if value is not None:
+            slots[missing_fields[0]] = value
+
+    # A pure opener ("which schemes am I eligible for") is also easy
+    if intent and not slots:
+        confidence = 0.8
+
+    return {
+        "intent": intent or ("provide_info" if slots else "unknown"),
+        "slots": slots,
+        "confidence": confidence
+    }
+
+
+def local_plan(user_text, memory, language, min_confidence=FAST_PATH_CONFIDENCE):
+    """
+    Planner-format decision from local rules, or None when the rules are
+    less than min_confidence sure and the LLM should decide.
+    """
+    profile = dict(memory.get("profile") or {"age": None, "income": None, "state": None})
+    missing = [k for k, v in profile.items() if v is None]
+
+    extracted = extract(user_text, language, missing)
+    if extracted["confidence"] < min_confidence:
+        return None
+
+    profile.update(extracted["slots"])
+    missing = [k for k, v in profile.items() if v is None]
+
+    plan = {
+        "intent": extracted["intent"],
+        "missing_fields": missing,
+        "slots": extracted["slots"],
+        "next_action": "ask_user" if missing else "call_tool",
+        "confidence": extracted["confidence"],
+        "source": "local"
+    }
+    if missing:
+        plan["question"] = field_prompt(missing[0], language)
+    return plan
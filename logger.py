@@ -1,23 +1,174 @@
+import atexit
+import contextvars
+import itertools
+import json
 import logging
+import logging.handlers
 import os
-from datetime import datetime
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 
-# Create logs directory
-os.makedirs("logs", exist_ok=True)
+# Records are queued by the caller and written as JSON lines by a
+# background listener, so logging never blocks a turn on disk I/O.
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_FILE = os.getenv("LOG_FILE", "agent.jsonl")
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "5"))
 
-log_file = f"logs/agent_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
+# When the writer falls behind, new records are dropped rather than
+# blocking the caller
+LOG_QUEUE_SIZE = 10000
 
-logging.basicConfig(
-    filename=log_file,
-    level=logging.INFO,
-    format="%(asctime)s | %(levelname)s | %(message)s",
-)
+# Correlation fields, set per session / turn. asyncio tasks and
+# async_agent.run_blocking carry them across awaits and threads.
+session_id_var = contextvars.ContextVar("session_id", default=None)
+turn_id_var = contextvars.ContextVar("turn_id", default=None)
 
-def log_info(message):
-    logging.info(message)
+_FIELDS = ("session_id", "turn_id", "stage", "duration")
 
-def log_error(message):
-    logging.error(message)
+_configured = False
+_lock = threading.Lock()
+_listener = None
+_logger = logging.getLogger("agent")
+_turn_ids = itertools.count(1)
 
-def log_warning(message):
-    logging.warning(message)
+
+# ================= FORMATTING =================
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, message, correlation and extra fields."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "message": record.getMessage()
+        }
+        for field in _FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """
+    Enqueues records without formatting them on the caller's thread.
+    Correlation ids are captured here, where the context is still the
+    caller's; records are dropped (and counted) when the queue is full.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        if getattr(record, "session_id", None) is None:
+            record.session_id = session_id_var.get()
+        if getattr(record, "turn_id", None) is None:
+            record.turn_id = turn_id_var.get()
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+# ================= SETUP =================
+
+def _configure():
+    """Starts the background writer on the first log call, not at import."""
+    global _configured, _listener
+    with _lock:
+        if _configured:
+            return
+
+        os.makedirs(LOG_DIR, exist_ok=True)
+        sink = logging.handlers.RotatingFileHandler(
+            os.path.join(LOG_DIR, LOG_FILE),
+            maxBytes=LOG_MAX_BYTES,
+            backupCount=LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+        sink.setFormatter(JsonFormatter())
+
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        _listener = logging.handlers.QueueListener(log_queue, sink, respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown)
+
+        _logger.addHandler(DroppingQueueHandler(log_queue))
+        _logger.setLevel(logging.INFO)
+        _logger.propagate = False
+        _configured = True
+
+
+def shutdown():
+    """Flushes queued records and stops the writer."""
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+def _log(level, message, fields):
+    if not _configured:
+        _configure()
+    extra = {"fields": fields}
+    for field in _FIELDS:
+        if field in fields:
+            extra[field] = fields.pop(field)
+    _logger.log(level, message, extra=extra)
+
+
+# ================= PUBLIC API =================
+
+def log_info(message, **fields):
+    _log(logging.INFO, message, fields)
+
+def log_error(message, **fields):
+    _log(logging.ERROR, message, fields)
+
+def log_warning(message, **fields):
+    _log(logging.WARNING, message, fields)
+
+
+def set_session(session_id):
+    """Tags every later record in this context with session_id."""
+    session_id_var.set(session_id)
+
+
+def next_turn():
+    """Starts a new turn in this context and returns its id."""
+    turn_id = next(_turn_ids)
+    turn_id_var.set(turn_id)
+    return turn_id
+
+
+def log_stage(stage, duration, message=None, **fields):
+    """Records how long a pipeline stage took (duration in seconds)."""
+    log_info(message or stage, stage=stage, duration=round(duration, 6), **fields)
+
+
+@contextmanager
+def timed(stage, **fields):
+    """Logs the duration of the enclosed block as one stage record."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        log_stage(stage, time.perf_counter() - start, **fields)
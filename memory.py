@@ -1,33 +1,89 @@
+from collections import deque
+
+PROFILE_FIELDS = ("age", "income", "state")
+
+# Turns kept per session; older ones are dropped, the profile keeps
+# everything the agent extracted from them
+HISTORY_LIMIT = 32
+
+
+class Profile:
+    """Eligibility fields as slots; fields outside PROFILE_FIELDS go to extra."""
+    __slots__ = PROFILE_FIELDS + ("extra",)
+
+    def __init__(self):
+        self.age = None
+        self.income = None
+        self.state = None
+        self.extra = None
+
+    def get(self, field):
+        if field in PROFILE_FIELDS:
+            return getattr(self, field)
+        return self.extra.get(field) if self.extra else None
+
+    def set(self, field, value):
+        if field in PROFILE_FIELDS:
+            setattr(self, field, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[field] = value
+
+    def as_dict(self):
+        profile = {field: getattr(self, field) for field in PROFILE_FIELDS}
+        if self.extra:
+            profile.update(self.extra)
+        return profile
+
+
+class Turn:
+    __slots__ = ("role", "text")
+
+    def __init__(self, role, text):
+        self.role = role
+        self.text = text
+
+    def as_dict(self):
+        return {"role": self.role, "text": self.text}
+
+
 class ConversationMemory:
-    def __init__(self, language):
-        self.memory = {
-            "language": language,
-            "profile": {
-                "age": None,
-                "income": None,
-                "state": None
-            },
-            "history": []
-        }
+    """
+    Per-call state: language, profile and the last HISTORY_LIMIT turns.
+
+    get_memory_snapshot() returns plain dicts, as before, but a new copy
+    on every call: the caller owns it, may edit or serialize it, and
+    nothing it does reaches the memory or other callers. The copy is
+    small (three fields and at most HISTORY_LIMIT turns).
+
+    Listeners added with add_listener(callback) are called as
+    callback(field, value) after every accepted profile update.
+    """
+    __slots__ = ("language", "profile", "history", "_missing", "_listeners")
+
+    def __init__(self, language, history_limit=HISTORY_LIMIT):
+        self.language = language
+        self.profile = Profile()
+        self.history = deque(maxlen=history_limit)
+        self._missing = set(PROFILE_FIELDS)
+        self._listeners = ()
+
+    def add_listener(self, callback):
+        self._listeners += (callback,)
 
     def add_user_utterance(self, text):
-        self.memory["history"].append({
-            "role": "user",
-            "text": text
-        })
+        self.history.append(Turn("user", text))
 
     def add_agent_utterance(self, text):
-        self.memory["history"].append({
-            "role": "agent",
-            "text": text
-        })
+        self.history.append(Turn("agent", text))
 
     def update_profile(self, field, value):
         """
         Updates profile field and detects contradiction.
         Returns True if contradiction detected.
         """
-        old_value = self.memory["profile"].get(field)
+        old_value = self.profile.get(field)
 
         if old_value is not None and old_value != value:
             return {
@@ -37,22 +93,52 @@ class ConversationMemory:
                 "new_value": value
             }
 
-        self.memory["profile"][field] = value
+        self.profile.set(field, value)
+        if value is None:
+            self._missing.add(field)
+        else:
+            self._missing.discard(field)
+        for listener in self._listeners:
+            listener(field, value)
         return {
             "contradiction": False
         }
 
     def get_missing_fields(self):
-        return [
-            k for k, v in self.memory["profile"].items()
-            if v is None
-        ]
+        missing = [f for f in PROFILE_FIELDS if f in self._missing]
+        if self.profile.extra:
+            missing += [f for f in self.profile.extra if f in self._missing]
+        return missing
 
     def get_memory_snapshot(self):
-        return self.memory
-    
+        return {
+            "language": self.language,
+            "profile": self.profile.as_dict(),
+            "history": [turn.as_dict() for turn in self.history]
+        }
+
+    def checkpoint(self):
+        """Language and profile: what session_store needs to resume the call."""
+        return {
+            "language": self.language,
+            "profile": self.profile.as_dict()
+        }
+
+    def restore(self, profile):
+        """Loads a checkpointed profile. Listeners are not called."""
+        for field, value in profile.items():
+            if value is not None:
+                self.profile.set(field, value)
+                self._missing.discard(field)
+
+    @property
+    def memory(self):
+        return self.get_memory_snapshot()
+
 # test
 if __name__ == "__main__":
+    import json
+
     mem = ConversationMemory(language="te")
 
     print(mem.get_missing_fields())
@@ -61,3 +147,13 @@ if __name__ == "__main__":
     print(mem.update_profile("age", 30))  # contradiction
 
     print(mem.get_memory_snapshot())
+
+    # Snapshots are plain data: they serialize, and edits stay local
+    mem.add_user_utterance("నా వయసు 25")
+    snapshot = mem.get_memory_snapshot()
+    assert json.loads(json.dumps(snapshot, ensure_ascii=False)) == snapshot
+    snapshot["profile"]["age"] = 99
+    snapshot["history"].clear()
+    assert mem.get_memory_snapshot()["profile"]["age"] == 25
+    assert len(mem.get_memory_snapshot()["history"]) == 1
+    print("✅ Snapshot round-trips through json")
@@ -1,17 +1,45 @@
 import os
+import copy
 import json
+import threading
+import time
+from collections import OrderedDict
 from dotenv import load_dotenv
-from google import genai
+from local_extractor import local_plan, normalize
+from logger import log_warning
+from resilience import ResilientClient
+from tracing import span, traced
 
 # Load environment variables
 load_dotenv()
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-if not GEMINI_API_KEY:
-    raise ValueError("GEMINI_API_KEY not found in .env file")
 
-# Initialize Gemini client
-client = genai.Client(api_key=GEMINI_API_KEY)
+# Gemini client, created on first use (get_client)
+client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    """
+    Shared Gemini client, created on first use.
+    Raises ValueError if GEMINI_API_KEY is not set.
+    """
+    global client
+    if client is None:
+        if not GEMINI_API_KEY:
+            raise ValueError("GEMINI_API_KEY not found in .env file")
+        with _client_lock:
+            if client is None:
+                from google import genai
+                client = genai.Client(api_key=GEMINI_API_KEY)
+    return client
+
+
+# Deadline for one planner decision, retries and hedged requests included
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "8"))
+
+llm = ResilientClient("gemini", deadline=LLM_DEADLINE_SECONDS, retries=2)
 
 def extract_json(text):
     start = text.find("{")
@@ -23,21 +51,15 @@ def extract_json(text):
     except json.JSONDecodeError:
         return None
 
-def planner(user_text, memory, language):
-    """
-    user_text: str (native language)
-    memory: dict (conversation memory so far)
-    language: detected language code
-    """
 
-    system_prompt = f"""
+SYSTEM_PROMPT = """
         You are an AI service agent helping users apply for government welfare schemes.
 
         STRICT RULES (DO NOT VIOLATE):
         - Respond ONLY with a valid JSON object
         - Do NOT add explanations, comments, or markdown
         - Do NOT wrap JSON in backticks
-        - Output must start with {{ and end with }}
+        - Output must start with { and end with }
 
         Your task:
         1. Identify user intent
@@ -62,36 +84,186 @@ def planner(user_text, memory, language):
         - Use the user's native language for questions
         """
 
+# Turns of history sent to the LLM; the profile carries everything older
+HISTORY_TURNS = 4
+
+PLANNER_CACHE_SIZE = 1024
+PLANNER_CACHE_TTL_SECONDS = 600
+
+
+# ================= PROMPT COMPACTION =================
+
+def compact_memory(memory, history_turns=HISTORY_TURNS):
+    """Profile plus the last few turns instead of the full memory."""
+    compact = {"profile": memory.get("profile", {})}
+    if "language" in memory:
+        compact["language"] = memory["language"]
+    history = memory.get("history") or []
+    if history_turns and history:
+        compact["history"] = history[-history_turns:]
+    return compact
+
+
+# ================= RESPONSE CACHE =================
+
+class PlannerCache:
+    """
+    LRU cache of planner decisions with a TTL, keyed on
+    (language, profile state, normalized utterance).
+    """
+
+    def __init__(self, max_entries=PLANNER_CACHE_SIZE, ttl_seconds=PLANNER_CACHE_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(user_text, memory, language):
+        profile = json.dumps(memory.get("profile", {}), sort_keys=True, ensure_ascii=False)
+        utterance = " ".join(normalize(user_text).split())
+        return language, profile, utterance
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[1])
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+cache = PlannerCache()
+
+
+# ================= FAST PATH STATS =================
+
+_stats_lock = threading.Lock()
+_stats = {
+    "calls": 0,
+    "llm_calls": 0,
+    "llm_fallbacks": 0,
+    "llm_seconds": 0.0,
+    "local_seconds": 0.0
+}
+
+
+def planner_stats():
+    """LLM-call rate and the latency the fast path and cache saved so far."""
+    with _stats_lock:
+        stats = dict(_stats)
+
+    local_calls = stats["calls"] - stats["llm_calls"]
+    mean_llm = stats["llm_seconds"] / stats["llm_calls"] if stats["llm_calls"] else 0.0
+    mean_local = stats["local_seconds"] / stats["calls"] if stats["calls"] else 0.0
+
+    return {
+        "calls": stats["calls"],
+        "llm_calls": stats["llm_calls"],
+        "llm_call_rate": stats["llm_calls"] / stats["calls"] if stats["calls"] else 0.0,
+        "llm_fallbacks": stats["llm_fallbacks"],
+        "llm_circuit": llm.breaker.state,
+        "mean_llm_latency_s": mean_llm,
+        "mean_local_latency_s": mean_local,
+        "cache_hits": cache.hits,
+        "cache_misses": cache.misses,
+        # Every local or cached answer would otherwise have cost one LLM round trip
+        "latency_saved_s": local_calls * mean_llm - stats["local_seconds"]
+    }
+
+
+def _record(field, seconds, llm=False):
+    with _stats_lock:
+        _stats[field] += seconds
+        if llm:
+            _stats["llm_calls"] += 1
+        else:
+            _stats["calls"] += 1
+
+
+@traced("planner")
+def planner(user_text, memory, language):
+    """
+    user_text: str (native language)
+    memory: dict (conversation memory so far)
+    language: detected language code
+
+    Easy turns (numbers, state names, the eligibility opener) are
+    answered by local rules; the LLM is only called when they are not
+    confident, and repeated inputs are served from the response cache.
+    If the LLM times out, keeps failing or its circuit is open, the
+    rules decide anyway (fallback_plan).
+    """
+
+    start = time.perf_counter()
+    with span("planner.local"):
+        plan = local_plan(user_text, memory, language)
+        if plan is None:
+            cache_key = PlannerCache.key(user_text, memory, language)
+            plan = cache.get(cache_key)
+    _record("local_seconds", time.perf_counter() - start)
+    if plan:
+        return plan
+
+    start = time.perf_counter()
+    try:
+        with span("planner.llm"):
+            plan = _llm_planner(user_text, memory, language)
+    except Exception as e:
+        with _stats_lock:
+            _stats["llm_fallbacks"] += 1
+        log_warning("Planner LLM unavailable, using rules", error=str(e))
+        return fallback_plan(user_text, memory, language)
+    finally:
+        _record("llm_seconds", time.perf_counter() - start, llm=True)
+
+    if plan.get("intent") != "unknown":
+        cache.put(cache_key, plan)
+    return plan
+
+
+def fallback_plan(user_text, memory, language):
+    """Rule-based decision while the LLM is degraded; asks for the next missing field."""
+    plan = local_plan(user_text, memory, language, min_confidence=0.0)
+    plan["source"] = "fallback"
+    return plan
+
+
+def _llm_planner(user_text, memory, language):
     user_prompt = f"""
         User language: {language}
 
         Conversation memory:
-        {json.dumps(memory, ensure_ascii=False)}
+        {json.dumps(compact_memory(memory), ensure_ascii=False)}
 
         User said:
         {user_text}
 
         Return JSON with keys:
-        intent, missing_fields, next_action, question (if next_action is ask_user)
+        intent, missing_fields, slots (eligibility fields the user just gave:
+        age and income as plain numbers, state as its name), next_action,
+        question (if next_action is ask_user)
         """
 
-    response = client.models.generate_content(
+    response = llm.call(
+        get_client().models.generate_content,
         model="models/gemini-2.0-flash",
-        contents=system_prompt + "\n" + user_prompt
+        contents=SYSTEM_PROMPT + "\n" + user_prompt
     )
 
-    """try:
-        response = client.models.generate_content(
-            model="models/gemini-2.5-flash",
-            contents=system_prompt + "\n" + user_prompt
-        )
-    except Exception as e:
-        return {
-            "intent": "error",
-            "next_action": "ask_user",
-            "question": "कृपया थोड़ी देर बाद फिर से प्रयास करें।"
-        }"""
-
     raw_text = response.text.strip()
     parsed = extract_json(raw_text)
 
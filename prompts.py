@@ -0,0 +1,37 @@
+# ================= STATIC PROMPTS =================
+# Fixed agent phrases, shared by the agent loops and the planner fast path.
+
+SUPPORTED_LANGUAGES = ["hi", "te", "mr", "ta", "bn"]
+
+LANGUAGE_SELECT_TEXT = "Please say Hindi, Telugu, Marathi, Tamil, or Bengali to choose your language."
+
+GREET_TEXT = {
+    "te": "నమస్కారం, దయచేసి మీ ప్రశ్న చెప్పండి.",
+    "hi": "नमस्ते, कृपया अपना प्रश्न बताएं।",
+    "mr": "नमस्कार, कृपया तुमचा प्रश्न सांगा.",
+    "ta": "வணக்கம், தயவுசெய்து உங்கள் கேள்வியை கூறுங்கள்.",
+    "bn": "নমস্কার, অনুগ্রহ করে আপনার প্রশ্ন বলুন।"
+}
+
+# Spoken instead of the greeting when a dropped call is resumed
+RESUME_TEXT = {
+    "te": "మళ్ళీ స్వాగతం, మనం ఆపిన చోట నుండి కొనసాగిద్దాం.",
+    "hi": "फिर से स्वागत है, जहाँ हमने छोड़ा था वहीं से आगे बढ़ते हैं।",
+    "mr": "पुन्हा स्वागत आहे, आपण जिथे थांबलो होतो तिथून पुढे जाऊया.",
+    "ta": "மீண்டும் வரவேற்கிறோம், நிறுத்திய இடத்திலிருந்து தொடர்வோம்.",
+    "bn": "আবার স্বাগতম, যেখানে থেমেছিলাম সেখান থেকে শুরু করি।"
+}
+
+FIELD_PROMPTS = {
+    "age": ("आपकी उम्र क्या है?", "మీ వయస్సు ఎంత?"),
+    "income": ("आपकी वार्षिक आय क्या है?", "మీ వార్షిక ఆదాయం ఎంత?"),
+    "state": ("आप किस राज्य में रहते हैं?", "మీరు ఏ రాష్ట్రంలో నివసిస్తున్నారు?")
+}
+
+
+def field_prompt(field, language):
+    return FIELD_PROMPTS[field][0] if language == "hi" else FIELD_PROMPTS[field][1]
+
+
+def thank_you_text(language):
+    return "धन्यवाद।" if language == "hi" else "ధన్యవాదాలు."
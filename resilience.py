@@ -0,0 +1,195 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a backend whose circuit is open."""
+
+
+# Errors that mean the backend is down, overloaded or slow: only these
+# are retried and count toward the circuit breaker. Anything else
+# (InvalidArgument, PermissionDenied, a bad config) would fail again
+# the same way and is raised to the caller at once.
+TRANSIENT_ERROR_NAMES = {"ServiceUnavailable", "ResourceExhausted", "DeadlineExceeded", "TooManyRequests"}
+TRANSIENT_GRPC_CODES = {"UNAVAILABLE", "RESOURCE_EXHAUSTED", "DEADLINE_EXCEEDED"}
+TRANSIENT_HTTP_CODES = {429, 503, 504}
+
+
+def is_transient(error):
+    """True for timeouts, UNAVAILABLE and RESOURCE_EXHAUSTED style errors."""
+    if isinstance(error, (TimeoutError, ConnectionError, CircuitOpenError)):
+        return True
+    if any(cls.__name__ in TRANSIENT_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+
+    # google.api_core errors carry grpc_status_code; raw grpc errors code();
+    # google.genai errors an HTTP status in code
+    code = getattr(error, "grpc_status_code", None) or getattr(error, "code", None)
+    if callable(code):
+        try:
+            code = code()
+        except Exception:
+            return False
+    if isinstance(code, int):
+        return code in TRANSIENT_HTTP_CODES
+    return getattr(code, "name", None) in TRANSIENT_GRPC_CODES
+
+
+# ================= CIRCUIT BREAKER =================
+
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; after
+    reset_timeout one trial call is let through (half-open) and its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def allow(self):
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+# ================= RESILIENT CLIENT =================
+
+class ResilientClient:
+    """
+    Runs blocking SDK calls with:
+    - a per-call deadline covering all attempts
+    - retries with jittered exponential backoff
+    - a hedged duplicate request once an attempt is slower than the
+      observed p95 latency
+    - a circuit breaker that fails fast while the backend is degraded
+
+    Only errors accepted by retry_on (default is_transient) are retried
+    and counted by the breaker; others are raised immediately.
+
+    Calls run on the client's own thread pool, so a hung SDK call never
+    blocks the caller past its deadline.
+    """
+
+    def __init__(self, name, deadline=10.0, retries=2, backoff=0.2, max_backoff=2.0,
+                 hedge=True, hedge_min_samples=20, breaker=None, max_workers=16, retry_on=is_transient):
+        self.name = name
+        self.retry_on = retry_on
+        self.deadline = deadline
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.breaker = breaker or CircuitBreaker()
+        self._latencies = deque(maxlen=200)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-call")
+
+    def hedge_delay(self):
+        """p95 of recent successful calls, or None until enough samples exist."""
+        if not self.hedge or len(self._latencies) < self.hedge_min_samples:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+    def call(self, func, *args, **kwargs):
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.name} circuit is open")
+
+        deadline_at = time.monotonic() + self.deadline
+        last_error = None
+
+        for attempt in range(self.retries + 1):
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+
+            try:
+                result = self._attempt(func, args, kwargs, remaining)
+            except Exception as e:
+                if not self.retry_on(e):
+                    # The backend answered; the request itself is bad
+                    self.breaker.record_success()
+                    raise
+                last_error = e
+                self.breaker.record_failure()
+                if self.breaker.state != "closed":
+                    break
+            else:
+                self.breaker.record_success()
+                return result
+
+            # Full jitter: sleep a random amount up to the capped backoff
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+            time.sleep(min(delay, max(0.0, deadline_at - time.monotonic())))
+
+        raise last_error or TimeoutError(f"{self.name} deadline exceeded")
+
+    def _timed(self, func, args, kwargs):
+        start = time.monotonic()
+        result = func(*args, **kwargs)
+        self._latencies.append(time.monotonic() - start)
+        return result
+
+    def _attempt(self, func, args, kwargs, timeout):
+        deadline_at = time.monotonic() + timeout
+        pending = {self._executor.submit(self._timed, func, args, kwargs)}
+
+        hedge_after = self.hedge_delay()
+        if hedge_after is not None and hedge_after < timeout:
+            done, pending = wait(pending, timeout=hedge_after)
+            if not done:
+                pending.add(self._executor.submit(self._timed, func, args, kwargs))
+            else:
+                return next(iter(done)).result()
+
+        # First successful response wins; a failure only counts once
+        # every outstanding request has failed.
+        error = None
+        while pending:
+            remaining = deadline_at - time.monotonic()
+            if remaining <= 0:
+                break
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = future.exception()
+
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"{self.name} call exceeded {timeout:.2f}s")
@@ -0,0 +1,300 @@
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import os
+import struct
+import time
+
+import numpy as np
+
+from audio_input import EnergyVAD, SAMPLE_RATE
+from memory import ConversationMemory
+from tts import get_audio, decode_mp3, PLAYBACK_SAMPLE_RATE
+from logger import log_info, log_warning, log_error, set_session
+from async_agent import async_agent_loop, aspeech_to_text, run_blocking
+
+HOST = "127.0.0.1"
+PORT = 8765
+
+MAX_SESSIONS = 200
+SESSION_TIMEOUT_SECONDS = 300   # whole call
+TURN_TIMEOUT_SECONDS = 15       # waiting for one user answer
+
+# A HELLO's caller_id is only a claim by the client, and it selects which
+# checkpoint is resumed. It is used only when the telephony gateway signs
+# it: caller_sig = hex HMAC-SHA256(CALLER_ID_SECRET, caller_id). Without
+# the secret, or with a bad signature, the call runs without resume.
+CALLER_ID_SECRET = os.getenv("CALLER_ID_SECRET", "")
+
+# ================= WIRE PROTOCOL =================
+# Every message is: 1-byte type | 4-byte big-endian length | payload
+#   client -> server: HELLO (JSON: caller_id, caller_sig), AUDIO (16 kHz int16 PCM),
+#                     END_OF_SPEECH, BYE
+#   server -> client: AUDIO (24 kHz int16 PCM), EVENT (JSON), BYE
+
+MSG_HELLO = 1
+MSG_AUDIO = 2
+MSG_END_OF_SPEECH = 3
+MSG_EVENT = 4
+MSG_BYE = 5
+
+# Largest payload a client may send (about 30 s of audio in one message)
+MAX_PAYLOAD = 1024 * 1024
+
+_HEADER = struct.Struct(">BI")
+
+
+class ProtocolError(ValueError):
+    """A client message the server will not accept; the session is ended."""
+
+
+async def read_message(reader, max_payload=MAX_PAYLOAD):
+    header = await reader.readexactly(_HEADER.size)
+    kind, length = _HEADER.unpack(header)
+    if length > max_payload:
+        raise ProtocolError(f"Payload of {length} bytes exceeds {max_payload}")
+    payload = await reader.readexactly(length) if length else b""
+    return kind, payload
+
+
+def write_message(writer, kind, payload=b""):
+    writer.write(_HEADER.pack(kind, len(payload)) + payload)
+
+
+def write_event(writer, **event):
+    write_message(writer, MSG_EVENT, json.dumps(event, ensure_ascii=False).encode("utf-8"))
+
+
+# ================= SESSIONS =================
+
+class RemoteClip:
+    """Playback position of audio sent to the caller, estimated from its duration."""
+
+    def __init__(self, duration):
+        self.duration = duration
+        self.sent_at = time.monotonic()
+
+    @property
+    def remaining_seconds(self):
+        return max(0.0, self.duration - (time.monotonic() - self.sent_at))
+
+
+class Session:
+    """One call: its memory, inbound audio queue and outbound transport."""
+
+    def __init__(self, session_id, caller_id, writer, turn_timeout=TURN_TIMEOUT_SECONDS):
+        self.session_id = session_id
+        self.caller_id = caller_id
+        self.writer = writer
+        self.turn_timeout = turn_timeout
+        self.inbound = asyncio.Queue()
+        self.memory = None
+        self.closed = False
+        self.protocol_error = None
+        self.started_at = time.monotonic()
+
+    def new_memory(self, language):
+        self.memory = ConversationMemory(language)
+        return self.memory
+
+    # ---- io interface used by async_agent_loop ----
+
+    async def speak(self, text, language, arm_lead=None):
+        pcm = await run_blocking(_synthesize_pcm, text, language)
+
+        # Audio that arrived before this prompt belongs to an earlier turn
+        while not self.inbound.empty():
+            self.inbound.get_nowait()
+
+        write_event(self.writer, type="prompt", text=text, language=language)
+        write_message(self.writer, MSG_AUDIO, pcm.tobytes())
+        await self.writer.drain()
+
+        clip = RemoteClip(len(pcm) / PLAYBACK_SAMPLE_RATE)
+        wait = clip.duration if arm_lead is None else clip.duration - arm_lead
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return clip
+
+    async def listen(self, filename, language, prompt_clip=None):
+        try:
+            audio = await asyncio.wait_for(
+                self._capture(prompt_clip.remaining_seconds if prompt_clip else 0),
+                self.turn_timeout
+            )
+        except asyncio.TimeoutError:
+            return {
+                "success": False,
+                "error": "Timed out waiting for caller audio"
+            }
+
+        result = await aspeech_to_text(audio, language)
+        write_event(self.writer, type="transcript", result=result)
+        return result
+
+    async def _capture(self, skip_seconds):
+        """Collects inbound frames until the VAD or the caller ends the utterance."""
+        vad = EnergyVAD()
+        skip_samples = int(skip_seconds * SAMPLE_RATE)
+        if self.closed:
+            return np.zeros(0, dtype=np.int16)
+
+        frames = []
+        while True:
+            frame = await self.inbound.get()
+            if frame is None:
+                break
+            if skip_samples > 0:
+                dropped = min(skip_samples, len(frame))
+                skip_samples -= dropped
+                frame = frame[dropped:]
+                if not len(frame):
+                    continue
+            frames.append(frame)
+            if vad.update(frame):
+                break
+
+        if not frames:
+            return np.zeros(0, dtype=np.int16)
+        return np.concatenate(frames)
+
+
+def _synthesize_pcm(text, language):
+    return decode_mp3(get_audio(text, language))
+
+
+def _parse_hello(payload):
+    """HELLO payload as a dict, or None if it is not a JSON object."""
+    try:
+        hello = json.loads(payload or b"{}")
+    except ValueError:
+        return None
+    return hello if isinstance(hello, dict) else None
+
+
+def sign_caller_id(caller_id, secret=CALLER_ID_SECRET):
+    """The caller_sig a gateway holding secret sends with caller_id."""
+    return hmac.new(secret.encode("utf-8"), caller_id.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def verified_caller_id(hello, secret=CALLER_ID_SECRET):
+    """hello's caller_id if its signature checks out, else None."""
+    caller_id = hello.get("caller_id")
+    signature = hello.get("caller_sig")
+    if not caller_id or not isinstance(caller_id, str):
+        return None
+    if not secret or not isinstance(signature, str):
+        log_warning("Ignoring unsigned caller id; the call will not be resumable")
+        return None
+    if not hmac.compare_digest(sign_caller_id(caller_id, secret), signature):
+        log_warning("Ignoring caller id with a bad signature")
+        return None
+    return caller_id
+
+
+class SessionManager:
+    """Hosts many concurrent calls in one process."""
+
+    def __init__(self, max_sessions=MAX_SESSIONS, session_timeout=SESSION_TIMEOUT_SECONDS,
+                 turn_timeout=TURN_TIMEOUT_SECONDS, caller_id_secret=CALLER_ID_SECRET):
+        self.max_sessions = max_sessions
+        self.caller_id_secret = caller_id_secret
+        self.session_timeout = session_timeout
+        self.turn_timeout = turn_timeout
+        self.sessions = {}
+        self._ids = itertools.count(1)
+
+    async def handle_connection(self, reader, writer):
+        try:
+            kind, payload = await asyncio.wait_for(read_message(reader), self.turn_timeout)
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError):
+            writer.close()
+            return
+        except ProtocolError as e:
+            log_warning(f"Rejected connection: {e}")
+            kind, payload = None, b""
+
+        hello = _parse_hello(payload) if kind == MSG_HELLO else None
+        if hello is None or len(self.sessions) >= self.max_sessions:
+            write_event(writer, type="error", error="Rejected")
+            write_message(writer, MSG_BYE)
+            writer.close()
+            return
+
+        caller_id = verified_caller_id(hello, self.caller_id_secret)
+        session = Session(next(self._ids), caller_id, writer, self.turn_timeout)
+        self.sessions[session.session_id] = session
+        # Each connection runs in its own task, so this only tags this call
+        set_session(session.session_id)
+        log_info(f"Session {session.session_id} started", caller_id=session.caller_id)
+
+        agent_task = asyncio.create_task(asyncio.wait_for(
+            async_agent_loop(session, memory_factory=session.new_memory, caller_id=session.caller_id),
+            self.session_timeout
+        ))
+        reader_task = asyncio.create_task(self._pump(reader, session, agent_task))
+        try:
+            result = await agent_task
+            write_event(writer, type="result", result=result)
+        except asyncio.TimeoutError:
+            log_warning(f"Session {session.session_id} timed out")
+            write_event(writer, type="error", error="Session timed out")
+        except asyncio.CancelledError:
+            # Cancelled by _pump on a bad message; anything else propagates
+            if session.protocol_error is None:
+                raise
+            log_warning(f"Session {session.session_id} ended: {session.protocol_error}")
+            write_event(writer, type="error", error=session.protocol_error)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            log_warning(f"Session {session.session_id} disconnected")
+        except Exception as e:
+            log_error(f"Session {session.session_id} failed: {e}")
+        finally:
+            reader_task.cancel()
+            agent_task.cancel()
+            del self.sessions[session.session_id]
+            try:
+                write_message(writer, MSG_BYE)
+                await writer.drain()
+                writer.close()
+            except ConnectionError:
+                pass
+
+    async def _pump(self, reader, session, agent_task):
+        """
+        Routes inbound frames to the session until the caller hangs up.
+        A malformed message ends the session: agent_task is cancelled and
+        the reason left in session.protocol_error.
+        """
+        try:
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == MSG_AUDIO:
+                    if len(payload) % 2:
+                        raise ProtocolError("Audio payload is not whole int16 samples")
+                    session.inbound.put_nowait(np.frombuffer(payload, dtype=np.int16))
+                elif kind == MSG_END_OF_SPEECH:
+                    session.inbound.put_nowait(None)
+                elif kind == MSG_BYE:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except ProtocolError as e:
+            session.protocol_error = str(e)
+            agent_task.cancel()
+        # Unblock a pending capture
+        session.closed = True
+        session.inbound.put_nowait(None)
+
+    async def serve(self, host=HOST, port=PORT):
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        log_info(f"Session server listening on {host}:{port}")
+        print(f"📞 Session server listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    asyncio.run(SessionManager().serve())
@@ -0,0 +1,278 @@
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+from logger import log_error, log_info
+
+# Checkpoints of unfinished calls, so a caller who drops mid-collection
+# resumes where they left off instead of answering everything again.
+SESSION_RESUME = os.getenv("SESSION_RESUME", "1") == "1"
+SESSION_DB = os.getenv("SESSION_DB", "sessions.db")
+
+# Checkpoints older than this are ignored (the caller starts over)
+SESSION_TTL_SECONDS = int(os.getenv("SESSION_TTL_SECONDS", str(24 * 3600)))
+
+# Write-behind: checkpoints are flushed in one transaction at least this
+# often, or sooner once WRITE_BEHIND_BATCH callers are pending
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "0.5"))
+WRITE_BEHIND_BATCH = 256
+
+
+# ================= STORES =================
+
+class SessionStore(ABC):
+    """
+    Checkpoints keyed by caller id. A checkpoint is a dict with
+    "language", "profile" and "saved_at" (epoch seconds); load() ignores
+    checkpoints older than ttl seconds.
+    Subclasses implement load and write_batch.
+    """
+
+    ttl = SESSION_TTL_SECONDS
+
+    def is_live(self, checkpoint):
+        return checkpoint is not None and checkpoint["saved_at"] >= time.time() - self.ttl
+
+    @abstractmethod
+    def load(self, caller_id):
+        """The caller's checkpoint, or None."""
+
+    @abstractmethod
+    def write_batch(self, items):
+        """items: {caller_id: checkpoint, or None to delete}."""
+
+    def save(self, caller_id, checkpoint):
+        self.write_batch({caller_id: checkpoint})
+
+    def delete(self, caller_id):
+        self.write_batch({caller_id: None})
+
+    def close(self):
+        pass
+
+
+class InMemorySessionStore(SessionStore):
+    """Process-local store; checkpoints survive a dropped call, not a restart."""
+
+    def __init__(self, ttl=SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, caller_id):
+        with self._lock:
+            checkpoint = self._data.get(caller_id)
+        return checkpoint if self.is_live(checkpoint) else None
+
+    def write_batch(self, items):
+        with self._lock:
+            for caller_id, checkpoint in items.items():
+                if checkpoint is None:
+                    self._data.pop(caller_id, None)
+                else:
+                    self._data[caller_id] = checkpoint
+
+
+class SQLiteSessionStore(SessionStore):
+    """Local SQLite file; one row per caller, profile stored as JSON."""
+
+    def __init__(self, path=SESSION_DB, ttl=SESSION_TTL_SECONDS):
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared by the writer thread and the agent threads, behind _lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "caller_id TEXT PRIMARY KEY, language TEXT NOT NULL, "
+                "profile TEXT NOT NULL, saved_at REAL NOT NULL)"
+            )
+
+    def load(self, caller_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT language, profile, saved_at FROM sessions WHERE caller_id = ? AND saved_at >= ?",
+                (caller_id, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "language": row[0],
+            "profile": json.loads(row[1]),
+            "saved_at": row[2]
+        }
+
+    def write_batch(self, items):
+        upserts = [
+            (caller_id, c["language"], json.dumps(c["profile"], ensure_ascii=False), c["saved_at"])
+            for caller_id, c in items.items() if c is not None
+        ]
+        deletes = [(caller_id,) for caller_id, c in items.items() if c is None]
+        with self._lock, self._conn:
+            if upserts:
+                self._conn.executemany("INSERT OR REPLACE INTO sessions VALUES (?, ?, ?, ?)", upserts)
+            if deletes:
+                self._conn.executemany("DELETE FROM sessions WHERE caller_id = ?", deletes)
+
+    def purge_expired(self):
+        """Deletes checkpoints past the TTL. Returns the number removed."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM sessions WHERE saved_at < ?", (time.time() - self.ttl,)
+            ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class WriteBehindStore(SessionStore):
+    """
+    Wraps a store so save() and delete() only record the latest state per
+    caller in memory; a background thread writes the pending entries in
+    one batch every `interval` seconds. Repeated checkpoints of a caller
+    between flushes cost one write. load() sees pending entries first,
+    under the wrapped store's TTL.
+    """
+
+    def __init__(self, store, interval=WRITE_BEHIND_INTERVAL, max_batch=WRITE_BEHIND_BATCH):
+        self.store = store
+        self.ttl = store.ttl
+        self.interval = interval
+        self.max_batch = max_batch
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="session-store-writer", daemon=True)
+        self._thread.start()
+
+    def load(self, caller_id):
+        with self._lock:
+            if caller_id in self._pending:
+                checkpoint = self._pending[caller_id]
+                return checkpoint if self.is_live(checkpoint) else None
+        return self.store.load(caller_id)
+
+    def write_batch(self, items):
+        with self._lock:
+            self._pending.update(items)
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def flush(self):
+        """
+        Writes everything pending now. Returns the number of callers written.
+        Entries stay pending, and visible to load(), until the write commits.
+        """
+        with self._lock:
+            items = dict(self._pending)
+        if not items:
+            return 0
+        try:
+            self.store.write_batch(items)
+        except Exception as e:
+            # Still pending, so the next round retries them
+            log_error(f"Session checkpoint write failed: {e}", callers=len(items))
+            return 0
+        with self._lock:
+            for caller_id, checkpoint in items.items():
+                # A newer checkpoint saved during the write stays for the next round
+                if caller_id in self._pending and self._pending[caller_id] is checkpoint:
+                    del self._pending[caller_id]
+        return len(items)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join()
+        self.flush()
+        self.store.close()
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_session_store():
+    """Shared write-behind SQLite store, opened on first use and flushed at exit."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = WriteBehindStore(SQLiteSessionStore())
+                atexit.register(_store.close)
+    return _store
+
+
+# ================= CHECKPOINT / RESUME =================
+
+def load_checkpoint(caller_id, store=None):
+    """The caller's unfinished session, or None (also when resuming is off)."""
+    if not caller_id or not SESSION_RESUME:
+        return None
+    checkpoint = (store or get_session_store()).load(caller_id)
+    if checkpoint:
+        log_info("Resuming session", caller_id=caller_id, profile=checkpoint["profile"])
+    return checkpoint
+
+
+def track(memory, caller_id, store=None):
+    """
+    Checkpoints memory's language and profile now and after every profile
+    update. Only queues the write, so it is safe on the hot path.
+    """
+    if not caller_id or not SESSION_RESUME:
+        return
+    store = store or get_session_store()
+
+    def checkpoint(field=None, value=None):
+        store.save(caller_id, dict(memory.checkpoint(), saved_at=time.time()))
+
+    checkpoint()
+    memory.add_listener(checkpoint)
+
+
+def finish(caller_id, store=None):
+    """Drops the checkpoint once the caller got their result."""
+    if caller_id and SESSION_RESUME:
+        (store or get_session_store()).delete(caller_id)
+
+
+# 🧪 TEST
+if __name__ == "__main__":
+    from memory import ConversationMemory
+
+    store = WriteBehindStore(SQLiteSessionStore("/tmp/sessions_test.db"), interval=0.1)
+    memory = ConversationMemory("te")
+    track(memory, "+911234567890", store)
+    memory.update_profile("age", 22)
+    memory.update_profile("income", 150000)
+
+    store.flush()
+    print("Checkpoint:", store.store.load("+911234567890"))
+
+    restored = ConversationMemory(load_checkpoint("+911234567890", store)["language"])
+    restored.restore(load_checkpoint("+911234567890", store)["profile"])
+    print("Missing after resume:", restored.get_missing_fields())
+
+    finish("+911234567890", store)
+    store.close()
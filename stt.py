@@ -1,13 +1,39 @@
 import os
+import threading
 from dotenv import load_dotenv
-from google.cloud import speech_v1p1beta1 as speech
-from audio_input import record_audio
+import numpy as np
+from audio_input import record_audio, stream_utterance, PRE_ROLL_SECONDS, RECORD_SECONDS
 from tts import speak
+from resilience import ResilientClient, is_transient
+from tracing import span, traced
+from keyword_matcher import get_matcher
+from logger import log_warning
 
 load_dotenv()
 
-# Google STT client
-client = speech.SpeechClient()
+# Streaming capture: VAD-endpointed frames fed to a streaming recognizer
+# instead of a fixed-length recording sent in one request.
+STREAMING_CAPTURE = os.getenv("STREAMING_CAPTURE", "0") == "1"
+
+# Google STT client, created on first use (get_client)
+client = None
+_client_lock = threading.Lock()
+
+# Deadline for one recognition, retries and hedged requests included
+STT_DEADLINE_SECONDS = float(os.getenv("STT_DEADLINE_SECONDS", "6"))
+
+# Transcribe locally with AI4BharatSTT when the cloud recognizer is down
+LOCAL_STT_FALLBACK = os.getenv("LOCAL_STT_FALLBACK", "1") == "1"
+
+recognizer = ResilientClient("google-stt", deadline=STT_DEADLINE_SECONDS, retries=1)
+
+# A stream is fed while the user speaks, so its deadline covers the longest
+# capture too. The frames can be read only once: no retries or hedging, but
+# it shares the circuit breaker with the one-shot recognizer.
+streaming_recognizer = ResilientClient(
+    "google-stt-streaming", deadline=PRE_ROLL_SECONDS + RECORD_SECONDS + STT_DEADLINE_SECONDS,
+    retries=0, hedge=False, breaker=recognizer.breaker
+)
 
 # ================= LANGUAGE MAP =================
 
@@ -27,21 +53,23 @@ LANGUAGE_CONFIRM_TEXT = {
     "bn": "আপনি বাংলা নির্বাচন করেছেন। আমরা কি বাংলায় এগিয়ে যাব? হ্যাঁ বা না বলুন।"
 }
 
-YES_WORDS = {
-    "hi": ["हाँ", "haan", "ha"],
-    "te": ["అవును"],
-    "ta": ["ஆம்"],
-    "mr": ["हो"],
-    "bn": ["হ্যাঁ"]
-}
+# ================= CLIENT =================
+
+def _speech():
+    # The Google Cloud SDK (grpc, protobuf) is slow to import
+    from google.cloud import speech_v1p1beta1 as speech
+    return speech
+
+
+def get_client():
+    """Shared Google STT client, created on first use."""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                client = _speech().SpeechClient()
+    return client
 
-NO_WORDS = {
-    "hi": ["नहीं", "nahin", "nahi"],
-    "te": ["కాదు"],
-    "ta": ["இல்லை"],
-    "mr": ["नको", "नाही"],
-    "bn": ["না"]
-}
 
 # ================= LANGUAGE CONFIRMATION =================
 
@@ -53,31 +81,47 @@ def confirm_language(language_code):
 
     speak(LANGUAGE_CONFIRM_TEXT[language_code], language_code)
 
-    audio_path = record_audio("audio/language_confirm.wav")
-    result = speech_to_text(audio_path, language_code)
+    result = listen("audio/language_confirm.wav", language_code)
 
     if not result["success"]:
         return False
 
-    reply = result["text"].lower()
+    # Yes/no words: keywords/yes_no.json
+    return get_matcher("yes_no", language_code).first(result["text"]) == "yes"
 
-    if any(word in reply for word in YES_WORDS[language_code]):
-        return True
 
-    if any(word in reply for word in NO_WORDS[language_code]):
-        return False
+# ================= SPEECH TO TEXT =================
 
-    return False
+def _audio_content(audio):
+    """
+    Raw bytes for the recognizer from a WAV path, raw 16 kHz LINEAR16 PCM
+    bytes/memoryview, or an int16 NumPy array. Bytes are passed through
+    as-is; arrays and views are copied once, as protobuf requires bytes.
+    """
+    if isinstance(audio, (str, os.PathLike)):
+        if not os.path.exists(audio):
+            return None
+        with open(audio, "rb") as audio_file:
+            return audio_file.read()
 
+    if isinstance(audio, bytes):
+        return audio
 
-# ================= SPEECH TO TEXT =================
+    if hasattr(audio, "tobytes"):
+        return audio.tobytes()
+
+    return bytes(audio)
 
-def speech_to_text(audio_path, language_hint):
+
+@traced("speech_to_text")
+def speech_to_text(audio, language_hint):
     """
     Converts speech to text using STRICT language locking.
+    audio: WAV file path, raw PCM bytes, or int16 NumPy array.
     """
 
-    if not os.path.exists(audio_path):
+    audio_content = _audio_content(audio)
+    if audio_content is None:
         return {
             "success": False,
             "error": "Audio file not found"
@@ -89,10 +133,8 @@ def speech_to_text(audio_path, language_hint):
             "error": "Unsupported language"
         }
 
-    with open(audio_path, "rb") as audio_file:
-        audio_content = audio_file.read()
-
-    audio = speech.RecognitionAudio(content=audio_content)
+    speech = _speech()
+    recognition_audio = speech.RecognitionAudio(content=audio_content)
 
     config = speech.RecognitionConfig(
         encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
@@ -102,12 +144,20 @@ def speech_to_text(audio_path, language_hint):
     )
 
     try:
-        response = client.recognize(config=config, audio=audio)
+        with span("stt.recognize", language=language_hint):
+            response = recognizer.call(get_client().recognize, config=config, audio=recognition_audio)
     except Exception as e:
-        return {
-            "success": False,
-            "error": str(e)
-        }
+        if not is_transient(e):
+            # Bad request or credentials: the local models would not help
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        # The original path/array: audio_content of a WAV includes its header
+        if isinstance(audio, os.PathLike):
+            audio = os.fspath(audio)
+        with span("stt.local_fallback", language=language_hint):
+            return local_speech_to_text(audio, language_hint, error=str(e))
 
     if not response.results:
         return {
@@ -125,6 +175,173 @@ def speech_to_text(audio_path, language_hint):
     }
 
 
+_local_stt = None
+_local_stt_lock = threading.Lock()
+
+
+def get_local_stt():
+    """
+    Shared local AI4BharatSTT behind a micro-batching server, loaded on
+    first use. Raises ImportError when torch/transformers are missing.
+    """
+    global _local_stt
+    if _local_stt is None:
+        with _local_stt_lock:
+            if _local_stt is None:
+                from stt_handler import AI4BharatSTT, ASRModelRegistry
+                from stt_batcher import BatchingSTTServer
+                _local_stt = BatchingSTTServer(AI4BharatSTT(registry=ASRModelRegistry()))
+    return _local_stt
+
+
+def local_speech_to_text(audio, language_hint, error="Cloud STT unavailable"):
+    """
+    Fallback used when the cloud recognizer times out, keeps failing or
+    its circuit is open. Returns the cloud error if no local model is available.
+    """
+    if not LOCAL_STT_FALLBACK:
+        return {
+            "success": False,
+            "error": error
+        }
+
+    try:
+        local_stt = get_local_stt()
+    except Exception as e:
+        return {
+            "success": False,
+            "error": f"{error}; local STT unavailable: {e}"
+        }
+
+    log_warning("Cloud STT unavailable, transcribing locally", error=error)
+    result = local_stt.process_audio(audio, language_hint)
+    result["source"] = "local"
+    return result
+
+
+# ================= STREAMING SPEECH TO TEXT =================
+
+class GoogleStreamingRecognizer:
+    """Google streaming recognition; audio is uploaded while it is captured."""
+
+    def recognize(self, frames, language_code):
+        speech = _speech()
+        config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=16000,
+                language_code=language_code,
+                enable_automatic_punctuation=True
+            ),
+            interim_results=False
+        )
+        requests = (
+            speech.StreamingRecognizeRequest(audio_content=frame.tobytes())
+            for frame in frames
+        )
+
+        transcripts = []
+        confidence = 0.0
+        for response in get_client().streaming_recognize(config=config, requests=requests):
+            for result in response.results:
+                if result.is_final:
+                    alternative = result.alternatives[0]
+                    transcripts.append(alternative.transcript.strip())
+                    confidence = alternative.confidence
+
+        if not transcripts:
+            return None
+        return {"text": " ".join(transcripts), "confidence": confidence}
+
+
+class StubRecognizer:
+    """
+    Offline stand-in for tests: drains the frames like a real recognizer
+    and returns a fixed transcript.
+    """
+
+    def __init__(self, transcript, confidence=1.0):
+        self.transcript = transcript
+        self.confidence = confidence
+        self.frames_seen = 0
+
+    def recognize(self, frames, language_code):
+        for _ in frames:
+            self.frames_seen += 1
+        if not self.transcript:
+            return None
+        return {"text": self.transcript, "confidence": self.confidence}
+
+
+@traced("speech_to_text_streaming")
+def speech_to_text_streaming(frames, language_hint, recognizer=None):
+    """
+    Transcribes an iterator of int16 frames as they arrive.
+    Returns the same result shape as speech_to_text. If the recognizer
+    times out or is unavailable, the audio captured so far is transcribed
+    locally; other recognizer errors are raised.
+    """
+
+    if language_hint not in LANGUAGE_MAP:
+        return {
+            "success": False,
+            "error": "Unsupported language"
+        }
+
+    recognizer = recognizer or GoogleStreamingRecognizer()
+    captured = []
+
+    def capture():
+        # Keeps a copy of every frame sent, for the local fallback
+        for frame in frames:
+            captured.append(frame)
+            yield frame
+
+    try:
+        with span("stt.recognize_streaming", language=language_hint):
+            result = streaming_recognizer.call(recognizer.recognize, capture(), LANGUAGE_MAP[language_hint])
+    except Exception as e:
+        if not is_transient(e):
+            raise
+        if not captured:
+            return {
+                "success": False,
+                "error": str(e)
+            }
+        with span("stt.local_fallback", language=language_hint):
+            return local_speech_to_text(np.concatenate(list(captured)), language_hint, error=str(e))
+
+    if not result:
+        return {
+            "success": False,
+            "error": "No speech detected"
+        }
+
+    return {
+        "success": True,
+        "text": result["text"],
+        "language": language_hint,
+        "confidence": result["confidence"]
+    }
+
+
+def listen(filename, language_hint, pre_roll_seconds=None):
+    """
+    Captures one user turn and transcribes it, using streaming capture
+    when STREAMING_CAPTURE is enabled and a fixed recording otherwise.
+    pre_roll_seconds: time until the user can start speaking; defaults
+    to the fixed recording pre-roll, or none for streaming capture.
+    """
+    if STREAMING_CAPTURE:
+        frames = stream_utterance(skip_seconds=pre_roll_seconds or 0)
+        return speech_to_text_streaming(frames, language_hint)
+
+    if pre_roll_seconds is None:
+        pre_roll_seconds = PRE_ROLL_SECONDS
+    audio = record_audio(filename, pre_roll_seconds)
+    return speech_to_text(audio, language_hint)
+
+
 # ================= LOCAL TEST =================
 if __name__ == "__main__":
     print("STT module ready with strict language locking and confirmation.")
@@ -0,0 +1,143 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+MAX_BATCH_SIZE = 8
+MAX_WAIT_MS = 25
+
+# Latency samples kept for the percentile metrics
+LATENCY_WINDOW = 2048
+
+
+class BatchingSTTServer:
+    """
+    Micro-batching front end for AI4BharatSTT.
+
+    Concurrent callers submit single utterances; a worker thread collects
+    them for up to max_wait_ms (or until max_batch_size is reached) and
+    runs them through process_batch in one forward pass.
+    """
+
+    def __init__(self, stt, max_batch_size=MAX_BATCH_SIZE, max_wait_ms=MAX_WAIT_MS):
+        self.stt = stt
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._requests = queue.Queue()
+        self._closed = False
+
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._completed = 0
+        self._batches = 0
+        self._started_at = time.monotonic()
+
+        self._worker = threading.Thread(target=self._run, name="stt-batcher", daemon=True)
+        self._worker.start()
+
+    # ---- client API ----
+
+    def submit(self, audio, language=None):
+        """Queues one utterance. Returns a Future with the process_audio result."""
+        if self._closed:
+            raise RuntimeError("BatchingSTTServer is closed")
+        future = Future()
+        self._requests.put((audio, language, future, time.monotonic()))
+        return future
+
+    def process_audio(self, audio, language=None):
+        """Blocking drop-in for AI4BharatSTT.process_audio."""
+        return self.submit(audio, language).result()
+
+    async def aprocess_audio(self, audio, language=None):
+        return await asyncio.wrap_future(self.submit(audio, language))
+
+    def close(self):
+        self._closed = True
+        self._requests.put(None)
+        self._worker.join()
+
+    # ---- worker ----
+
+    def _collect(self):
+        """Blocks for the first request, then gathers more until the deadline."""
+        first = self._requests.get()
+        if first is None:
+            return None
+
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                request = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if request is None:
+                self._requests.put(None)  # finish this batch, then stop
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+
+            # Each language runs on its own model, so batch per language
+            by_language = {}
+            for request in batch:
+                by_language.setdefault(request[1], []).append(request)
+
+            for language, requests in by_language.items():
+                self._run_batch(language, requests)
+
+    def _run_batch(self, language, requests):
+        try:
+            results = self.stt.process_batch([audio for audio, _, _, _ in requests], language)
+        except Exception as e:
+            for _, _, future, _ in requests:
+                future.set_exception(e)
+            return
+
+        done_at = time.monotonic()
+        with self._lock:
+            self._batches += 1
+            self._completed += len(requests)
+            for _, _, _, submitted_at in requests:
+                self._latencies.append(done_at - submitted_at)
+
+        for (_, _, future, _), result in zip(requests, results):
+            future.set_result(result)
+
+    # ---- metrics ----
+
+    def metrics(self):
+        """Throughput, batch-size and latency statistics since start."""
+        with self._lock:
+            latencies = sorted(self._latencies)
+            completed = self._completed
+            batches = self._batches
+        elapsed = time.monotonic() - self._started_at
+
+        return {
+            "completed": completed,
+            "batches": batches,
+            "mean_batch_size": completed / batches if batches else 0.0,
+            "throughput_per_s": completed / elapsed if elapsed else 0.0,
+            "latency_p50_ms": _percentile(latencies, 50) * 1000,
+            "latency_p95_ms": _percentile(latencies, 95) * 1000,
+            "latency_p99_ms": _percentile(latencies, 99) * 1000
+        }
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
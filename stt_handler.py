@@ -1,55 +1,310 @@
+import gc
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
 import torch
 from transformers import pipeline
 from ai4bharat.IndicLID import IndicLID # Ensure you have followed AI4Bharat installation for IndicLID
 
+SAMPLE_RATE = 16000
+
+# IndicWhisper checkpoint per language code
+ASR_MODELS = {
+    "hi": "ai4bharat/indicwhisper-hindi",
+    "te": "ai4bharat/indicwhisper-telugu",
+    "ta": "ai4bharat/indicwhisper-tamil",
+    "mr": "ai4bharat/indicwhisper-marathi",
+    "bn": "ai4bharat/indicwhisper-bengali"
+}
+
+# RAM the registry may keep resident across all loaded ASR models
+ASR_RAM_BUDGET_MB = int(os.getenv("ASR_RAM_BUDGET_MB", "4096"))
+
+# Assumed size of a model not loaded before (IndicWhisper medium, fp32)
+ASR_MODEL_MB_ESTIMATE = int(os.getenv("ASR_MODEL_MB_ESTIMATE", "3072"))
+
+# Inference backends:
+# - torch: fp32 transformers model (GPU if available)
+# - int8:  dynamically int8-quantized Linear layers, CPU only
+# - onnx:  ONNX Runtime export via optimum, CPU
+ASR_BACKENDS = ("torch", "int8", "onnx")
+ONNX_CACHE_DIR = os.path.join("models", "onnx")
+
+
+def _pipeline_input(audio):
+    """
+    Maps a WAV path, raw 16 kHz int16 PCM bytes/memoryview, or an int16
+    NumPy array to ASR pipeline input. PCM buffers are viewed in place;
+    the only copy is the int16 -> float32 conversion the model needs.
+    """
+    if isinstance(audio, str):
+        return audio
+
+    if not isinstance(audio, np.ndarray):
+        audio = np.frombuffer(audio, dtype=np.int16)
+
+    if audio.dtype == np.int16:
+        audio = audio.astype(np.float32) / 32768.0
+
+    return {"raw": audio.reshape(-1), "sampling_rate": SAMPLE_RATE}
+
+
+def _lid_language(prediction):
+    """Language code from an IndicLID prediction (dict or result tuple)."""
+    if isinstance(prediction, dict):
+        return prediction.get("lang", "unknown")
+    # batch_predict yields (text, lang, score, model_name)
+    return prediction[1]
+
+
+def _validate(text, prediction):
+    """Steps B, D, E of process_audio for one transcription."""
+    if not text:
+        return {
+            "success": False,
+            "error": "Empty transcription"
+        }
+
+    language = _lid_language(prediction)
+    if language == "en":
+        return {
+            "success": False,
+            "error": "English detected. Please speak in a native Indian language."
+        }
+
+    return {
+        "success": True,
+        "text": text,
+        "language": language
+    }
+
+
+# ================= MODEL REGISTRY =================
+
+_lid_model = None
+_lid_lock = threading.Lock()
+
+
+def get_lid_model():
+    """The process-wide IndicLID model, loaded on first use."""
+    global _lid_model
+    with _lid_lock:
+        if _lid_model is None:
+            # Note: Follow local installation from AI4Bharat GitHub for the model files
+            _lid_model = IndicLID(input_threshold=0.5, roman_lid_threshold=0.6)
+        return _lid_model
+
+
+def default_device():
+    return "cuda" if torch.cuda.is_available() else "cpu"
+
+
+def load_asr_pipeline(model_path, device, backend="torch"):
+    if backend not in ASR_BACKENDS:
+        raise ValueError(f"Unknown ASR backend: {backend}")
+
+    if backend == "onnx":
+        return _load_onnx_pipeline(model_path)
+
+    if backend == "int8" and device != "cpu":
+        raise ValueError("The int8 backend runs on CPU only")
+
+    asr_pipeline = pipeline(
+        "automatic-speech-recognition",
+        model=model_path,
+        device=device
+    )
+
+    if backend == "int8":
+        asr_pipeline.model = torch.quantization.quantize_dynamic(
+            asr_pipeline.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return asr_pipeline
+
+
+def _load_onnx_pipeline(model_path):
+    """
+    Exports the model to ONNX on first use (cached under ONNX_CACHE_DIR)
+    and wraps the ONNX Runtime session in a regular ASR pipeline.
+    """
+    try:
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+    except ImportError:
+        raise ImportError("The onnx backend requires optimum: pip install optimum[onnxruntime]")
+    from transformers import AutoProcessor
+
+    export_dir = os.path.join(ONNX_CACHE_DIR, model_path.replace("/", "__"))
+    if os.path.isdir(export_dir):
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(export_dir)
+    else:
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(model_path, export=True)
+        model.save_pretrained(export_dir)
+
+    processor = AutoProcessor.from_pretrained(model_path)
+    return pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        tokenizer=processor.tokenizer,
+        feature_extractor=processor.feature_extractor
+    )
+
+
+def _model_bytes(asr_pipeline):
+    """Approximate resident size of a pipeline's weights."""
+    model = asr_pipeline.model
+
+    # ONNX Runtime models hold their weights in the exported files
+    if not hasattr(model, "state_dict"):
+        model_dir = getattr(model, "model_save_dir", None)
+        if not model_dir:
+            return 0
+        return sum(
+            os.path.getsize(os.path.join(model_dir, name))
+            for name in os.listdir(model_dir)
+        )
+
+    # Quantized layers keep packed weights outside parameters()
+    total = 0
+    for value in model.state_dict().values():
+        for tensor in value if isinstance(value, tuple) else (value,):
+            if isinstance(tensor, torch.Tensor):
+                total += tensor.numel() * tensor.element_size()
+    return total
+
+
+class ASRModelRegistry:
+    """
+    ASR pipelines keyed by language code, loaded on first use.
+    Room for a model is made before it is loaded, by evicting the least
+    recently used ones, so resident weights stay within ram_budget_mb
+    (a single model larger than the budget is still loaded). Until a
+    model has been loaded once its size is taken as model_mb_estimate.
+
+    Loads run outside the lock, so cache hits for other languages never
+    wait on one; concurrent requests for the same language share a load.
+    """
+
+    def __init__(self, models=ASR_MODELS, ram_budget_mb=ASR_RAM_BUDGET_MB, device=None,
+                 backend="torch", loader=load_asr_pipeline, model_mb_estimate=ASR_MODEL_MB_ESTIMATE):
+        self.models = models
+        self.ram_budget = ram_budget_mb * 1024 * 1024
+        self.device = device or ("cpu" if backend != "torch" else default_device())
+        self.backend = backend
+        self.loader = loader
+        self.model_estimate = model_mb_estimate * 1024 * 1024
+        self._loaded = OrderedDict()  # language -> (pipeline, bytes)
+        self._sizes = {}              # language -> measured bytes, kept across evictions
+        self._loading = {}            # language -> (Event set when done, reserved bytes)
+        self._lock = threading.Lock()
+
+    def get(self, language):
+        if language not in self.models:
+            raise ValueError(f"No ASR model registered for language: {language}")
+
+        while True:
+            with self._lock:
+                if language in self._loaded:
+                    self._loaded.move_to_end(language)
+                    return self._loaded[language][0]
+                if language not in self._loading:
+                    estimate = self._sizes.get(language, self.model_estimate)
+                    self._make_room(estimate)
+                    done = threading.Event()
+                    self._loading[language] = (done, estimate)
+                    break
+                done = self._loading[language][0]
+            # Another thread is loading this language; use its result
+            done.wait()
+
+        try:
+            asr_pipeline = self.loader(self.models[language], self.device, self.backend)
+            size = _model_bytes(asr_pipeline)
+        except BaseException:
+            with self._lock:
+                del self._loading[language]
+            done.set()
+            raise
+
+        with self._lock:
+            del self._loading[language]
+            self._sizes[language] = size
+            self._loaded[language] = (asr_pipeline, size)
+            # The estimate may have been low; trim others, never this one
+            self._make_room(0, keep=language)
+        done.set()
+        return asr_pipeline
+
+    @property
+    def resident_bytes(self):
+        return sum(size for _, size in self._loaded.values())
+
+    @property
+    def loaded_languages(self):
+        return list(self._loaded)
+
+    def _make_room(self, size, keep=None):
+        """
+        Evicts LRU models until size more bytes (plus loads in flight)
+        fit. keep, if given, is the most recently used model and stays.
+        """
+        reserved = sum(estimate for _, estimate in self._loading.values())
+        floor = 1 if keep in self._loaded else 0
+        evicted = False
+        while len(self._loaded) > floor and self.resident_bytes + reserved + size > self.ram_budget:
+            self._loaded.popitem(last=False)
+            evicted = True
+        if evicted:
+            gc.collect()
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+
+
+# ================= LOCAL STT =================
+
 class AI4BharatSTT:
-    def __init__(self, asr_model_path="ai4bharat/indicwhisper-hindi"):
+    def __init__(self, asr_model_path="ai4bharat/indicwhisper-hindi", device=None, registry=None, backend="torch"):
+        """
+        asr_model_path: single model used for every request, or
+        registry: ASRModelRegistry to pick a model per request language.
+        backend: "torch" (fp32), "int8" (quantized, CPU) or "onnx" (ONNX Runtime, CPU).
+        """
+        self.device = device or ("cpu" if backend != "torch" else default_device())
+        self.registry = registry
+        self.asr_pipeline = None
+
         # 1. Initialize ASR (Speech-to-Text) Pipeline
         # You can swap model_path for other languages like 'indicwhisper-marathi'
-        self.device = "cuda" if torch.cuda.is_available() else "cpu"
-        self.asr_pipeline = pipeline(
-            "automatic-speech-recognition", 
-            model=asr_model_path, 
-            device=self.device
-        )
-        
-        # 2. Initialize Language Identifier (LID)
-        # Note: Follow local installation from AI4Bharat GitHub for the model files
-        self.lid_model = IndicLID(input_threshold=0.5, roman_lid_threshold=0.6)
+        if registry is None:
+            self.asr_pipeline = load_asr_pipeline(asr_model_path, self.device, backend)
 
-    def process_audio(self, audio_path):
-        """Transcribes audio and validates language."""
+        # 2. Initialize Language Identifier (LID), shared by all instances
+        self.lid_model = get_lid_model()
+
+    def _asr_for(self, language):
+        if self.registry is None:
+            return self.asr_pipeline
+        return self.registry.get(language or "hi")
+
+    def process_audio(self, audio, language=None):
+        """
+        Transcribes audio and validates language.
+        audio: WAV file path, raw PCM bytes, or int16 NumPy array.
+        language: selects the ASR model when a registry is in use.
+        """
         try:
             # Step A: Transcribe audio to text
-            transcription = self.asr_pipeline(audio_path)
+            transcription = self._asr_for(language)(_pipeline_input(audio))
             text = transcription.get("text", "").strip()
 
-            # Step B: Failure Handling - Check for empty transcription
-            if not text:
-                return {
-                    "success": False,
-                    "error": "Empty transcription"
-                }
-
             # Step C: Detect Language using IndicLID
             # IndicLID identifies if the text is in native script, romanized, or English
-            predictions = self.lid_model.predict(text)
             # Example prediction output: {'lang': 'hi', 'score': 0.9}
-            language = predictions.get("lang", "unknown")
+            predictions = self.lid_model.predict(text) if text else None
 
-            # Step D: Filter English
-            if language == "en":
-                return {
-                    "success": False,
-                    "error": "English detected. Please speak in a native Indian language."
-                }
-
-            # Step E: Return Successful Result
-            return {
-                "success": True,
-                "text": text,
-                "language": language
-            }
+            # Steps B, D, E: empty transcription, English filter, result
+            return _validate(text, predictions)
 
         except Exception as e:
             return {
@@ -57,6 +312,37 @@ class AI4BharatSTT:
                 "error": str(e)
             }
 
+    def process_batch(self, audios, language=None):
+        """
+        Transcribes several utterances (of one language) in one padded
+        forward pass and runs LID on the transcripts as one batch.
+        Returns one process_audio-style result per input, in order.
+        """
+        try:
+            inputs = [_pipeline_input(audio) for audio in audios]
+            transcriptions = self._asr_for(language)(inputs, batch_size=len(inputs))
+            texts = [t.get("text", "").strip() for t in transcriptions]
+
+            # Only non-empty transcripts go through LID
+            to_identify = [text for text in texts if text]
+            predictions = iter(
+                self.lid_model.batch_predict(to_identify, len(to_identify)) if to_identify else []
+            )
+
+            return [
+                _validate(text, next(predictions) if text else None)
+                for text in texts
+            ]
+
+        except Exception as e:
+            return [
+                {
+                    "success": False,
+                    "error": str(e)
+                }
+                for _ in audios
+            ]
+
 if __name__ == "__main__":
     # Example usage:
     stt = AI4BharatSTT()
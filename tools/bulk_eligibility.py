@@ -0,0 +1,303 @@
+"""
+Bulk eligibility screening for beneficiary exports (CSV, CSV.gz or Parquet).
+
+The input is read in chunks and the chunks are screened in parallel by a
+process pool. Each worker loads the scheme catalog once (memory-mapped
+if tools/schemes.bin is current), the same version the run started
+with; if schemes.json changes mid-run the run fails rather than mixing
+versions. At most --max-in-flight chunks are
+held at a time, and results are written in input order as they
+complete, so memory stays bounded whatever the input size.
+
+    python -m tools.bulk_eligibility beneficiaries.csv -o results.csv --counts counts.csv
+    python -m tools.bulk_eligibility export.parquet --id-col beneficiary_id --workers 8
+
+Output has one row per input row: the id (or row number), status ("ok"
+or "missing" when age, income or state is absent) and the eligible
+schemes. The age, income
+and state columns must exist in the input; blank
+lines are skipped. Parquet input needs pyarrow.
+"""
+import argparse
+import csv
+import gzip
+import io
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+
+from tools.eligibility_engine import check_eligibility_batch
+from tools.scheme_retriever import BINARY_FILE, SCHEME_FILE, SchemeCatalog, get_catalog
+
+CHUNK_SIZE = 100_000
+
+# Separator between scheme names in the "eligible" column
+NAME_SEPARATOR = ";"
+
+
+# ================= WORKER =================
+
+_columns = None       # (age, income, state, id) input column names
+_match_state = False
+_catalog = None       # the snapshot every chunk in this worker is screened against
+
+
+def _init_worker(columns, match_state, catalog_mtime):
+    """
+    Runs once per worker process: options fixed and the catalog loaded.
+    The catalog must be the version the parent started with, so every
+    worker's results line up with the parent's scheme columns.
+    """
+    global _columns, _match_state, _catalog
+    _columns = columns
+    _match_state = match_state
+    catalog = SchemeCatalog(SCHEME_FILE, BINARY_FILE)
+    catalog.refresh()
+    if catalog.snapshot.mtime != catalog_mtime:
+        raise RuntimeError("schemes.json changed since the run started")
+    _catalog = catalog.snapshot
+
+
+def _parse_number(value):
+    try:
+        return float(value.replace(",", "")) if value else np.nan
+    except (AttributeError, ValueError):
+        return np.nan
+
+
+def _parse_csv_chunk(header, lines):
+    rows = csv.reader(lines)
+    positions = [header.index(name) if name in header else None for name in _columns]
+    ids, ages, incomes, states = [], [], [], []
+    for row in rows:
+        values = [row[p] if p is not None and p < len(row) else "" for p in positions]
+        ages.append(_parse_number(values[0]))
+        incomes.append(_parse_number(values[1]))
+        states.append(values[2].strip())
+        ids.append(values[3] if positions[3] is not None else None)
+    return ids, ages, incomes, states
+
+
+def screen_chunk(task):
+    """
+    Screens one chunk. task is (offset, "csv", header, lines) or
+    (offset, "columns", ids, ages, incomes, states).
+    Returns (offset, rows, missing, per-scheme eligible counts, output text).
+    """
+    offset, kind = task[0], task[1]
+    if kind == "csv":
+        ids, ages, incomes, states = _parse_csv_chunk(*task[2:])
+    else:
+        ids, ages, incomes, states = task[2:]
+        ages = [np.nan if v is None else v for v in ages]
+        incomes = [np.nan if v is None else v for v in incomes]
+
+    state_codes = [_catalog.state_code(s) for s in states]
+    result = check_eligibility_batch(ages, incomes, state_codes, match_state=_match_state, catalog=_catalog)
+
+    eligible = result["eligible"]
+    missing = result["missing"]
+    names = result["schemes"]
+
+    # Rows share a handful of eligibility patterns; join each pattern once
+    joined = {}
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    for row in range(len(missing)):
+        row_id = ids[row] if ids[row] is not None else offset + row
+        if missing[row]:
+            writer.writerow((row_id, "missing", 0, ""))
+            continue
+        key = eligible[row].tobytes()
+        if key not in joined:
+            picked = np.flatnonzero(eligible[row])
+            joined[key] = (len(picked), NAME_SEPARATOR.join(names[i] for i in picked))
+        writer.writerow((row_id, "ok", *joined[key]))
+
+    counts = eligible.sum(axis=0, dtype=np.int64)
+    return offset, len(missing), int(missing.sum()), counts, out.getvalue()
+
+
+# ================= INPUT =================
+
+def _open_text(path):
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, "r", encoding="utf-8", newline="")
+
+
+def check_columns(available, columns):
+    """Exits naming the first configured column the input lacks."""
+    needed = [name for name in columns if name]
+    for name in needed:
+        if name not in available:
+            raise SystemExit(f"❌ Column '{name}' not found in the input (has: {', '.join(available)})")
+
+
+def read_csv_header(f):
+    return [name.strip() for name in next(csv.reader([f.readline()]), [])]
+
+
+def read_csv_chunks(f, header, chunk_size):
+    """
+    (offset, "csv", header, lines) tasks of raw lines from f, positioned
+    after the header; workers do the parsing. Quoted fields spanning
+    lines are kept in one record, and blank lines are skipped.
+    """
+    with f:
+        offset = 0
+        lines = []
+        pending = ""
+        for line in f:
+            if pending:
+                line = pending + line
+                pending = ""
+            elif not line.strip():
+                continue
+            if line.count('"') % 2:
+                pending = line
+                continue
+            lines.append(line)
+            if len(lines) == chunk_size:
+                yield offset, "csv", header, lines
+                offset += len(lines)
+                lines = []
+        if pending:
+            lines.append(pending)
+        if lines:
+            yield offset, "csv", header, lines
+
+
+def open_parquet(path):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise SystemExit("❌ Parquet input needs pyarrow (pip install pyarrow)")
+    return pq.ParquetFile(path)
+
+
+def read_parquet_chunks(parquet, chunk_size, columns):
+    available = set(parquet.schema_arrow.names)
+    wanted = [name for name in columns if name and name in available]
+    offset = 0
+    for batch in parquet.iter_batches(batch_size=chunk_size, columns=wanted):
+        data = batch.to_pydict()
+        rows = batch.num_rows
+        ages = data.get(columns[0], [None] * rows)
+        incomes = data.get(columns[1], [None] * rows)
+        states = [s or "" for s in data.get(columns[2], [None] * rows)]
+        ids = data.get(columns[3], [None] * rows) if columns[3] else [None] * rows
+        yield offset, "columns", ids, ages, incomes, states
+        offset += rows
+
+
+# ================= DRIVER =================
+
+def run(tasks, output, columns, match_state, workers, max_in_flight, catalog_mtime, id_header="row"):
+    """
+    Screens tasks on a process pool, writing results to output in input
+    order. Workers screen against the catalog version catalog_mtime.
+    Returns (rows, missing, per-scheme counts).
+    """
+    rows = missing = 0
+    counts = None
+    output.write(f"{id_header},status,eligible_count,eligible\n")
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(columns, match_state, catalog_mtime)) as pool:
+        in_flight = deque()
+
+        def drain_one():
+            nonlocal rows, missing, counts
+            _, chunk_rows, chunk_missing, chunk_counts, text = in_flight.popleft().result()
+            output.write(text)
+            rows += chunk_rows
+            missing += chunk_missing
+            counts = chunk_counts if counts is None else counts + chunk_counts
+
+        for task in tasks:
+            # Bounded: never more than max_in_flight chunks read ahead
+            while len(in_flight) >= max_in_flight:
+                drain_one()
+            in_flight.append(pool.submit(screen_chunk, task))
+        while in_flight:
+            drain_one()
+
+    return rows, missing, counts
+
+
+def write_counts(path, names, counts):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(("scheme", "eligible"))
+        for name, count in zip(names, counts.tolist()):
+            writer.writerow((name, count))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help="CSV, CSV.gz or Parquet file ('-' for CSV on stdin)")
+    parser.add_argument("-o", "--output", default="-", help="results CSV ('-' for stdout)")
+    parser.add_argument("--counts", help="write per-scheme eligible counts to this CSV")
+    parser.add_argument("--format", choices=["csv", "parquet"], help="input format (default: from extension)")
+    parser.add_argument("--age-col", default="age")
+    parser.add_argument("--income-col", default="income")
+    parser.add_argument("--state-col", default="state")
+    parser.add_argument("--id-col", help="column copied to the output (default: row number)")
+    parser.add_argument("--match-state", action="store_true", help="also fail schemes not offered in the state")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--max-in-flight", type=int, help="chunks held at once (default: 2 x workers)")
+    args = parser.parse_args()
+
+    columns = (args.age_col, args.income_col, args.state_col, args.id_col)
+    fmt = args.format or ("parquet" if args.input.endswith(".parquet") else "csv")
+    if fmt == "parquet":
+        parquet = open_parquet(args.input)
+        check_columns(parquet.schema_arrow.names, columns)
+        tasks = read_parquet_chunks(parquet, args.chunk_size, columns)
+    else:
+        f = _open_text(args.input)
+        header = read_csv_header(f)
+        check_columns(header, columns)
+        tasks = read_csv_chunks(f, header, args.chunk_size)
+
+    # One snapshot for the whole run: names and counts line up with the workers'
+    catalog = get_catalog()
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    start = time.perf_counter()
+    try:
+        rows, missing, counts = run(
+            tasks, output, columns, args.match_state, args.workers,
+            args.max_in_flight or 2 * args.workers, catalog.mtime, args.id_col or "row"
+        )
+    except BrokenProcessPool:
+        if os.stat(SCHEME_FILE).st_mtime_ns != catalog.mtime:
+            raise SystemExit("❌ schemes.json changed during the run; start it again")
+        raise
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    elapsed = time.perf_counter() - start
+
+    if counts is None:
+        counts = np.zeros(len(catalog), dtype=np.int64)
+    if args.counts:
+        write_counts(args.counts, catalog.names, counts)
+
+    report = sys.stderr
+    print(f"✅ {rows} rows in {elapsed:.2f}s ({rows / elapsed if elapsed else 0:,.0f} rows/s, "
+          f"{args.workers} workers), {missing} with missing fields", file=report)
+    top = sorted(zip(counts.tolist(), catalog.names), reverse=True)[:10]
+    for count, name in top:
+        print(f"   {count:>12,}  {name}", file=report)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,39 @@
-from tools.scheme_retriever import load_schemes
+from tools.scheme_retriever import get_catalog, MISSING_STATE
+from tracing import traced
 
-def check_eligibility(user_profile):
-    schemes = load_schemes()
+# Per-rule failure bits used by the batch API
+REASON_MIN_AGE = 1
+REASON_MAX_AGE = 2
+REASON_INCOME = 4
+REASON_STATE = 8
 
-    eligible = []
-    not_eligible = []
+REASON_TEXT = {
+    REASON_MIN_AGE: "Age below minimum requirement",
+    REASON_MAX_AGE: "Age above maximum limit",
+    REASON_INCOME: "Income exceeds limit",
+    REASON_STATE: "Scheme not offered in state"
+}
+
+# Per-field bits for profiles missing a required field
+MISSING_AGE = 1
+MISSING_INCOME = 2
+MISSING_STATE_FIELD = 4
+
+MISSING_TEXT = {
+    MISSING_AGE: "age",
+    MISSING_INCOME: "income",
+    MISSING_STATE_FIELD: "state"
+}
+
+BATCH_CHUNK_SIZE = 65536
 
-    required_fields = ["age", "income", "state"]
-    missing = [f for f in required_fields if not user_profile.get(f)]
+REQUIRED_FIELDS = ("age", "income", "state")
+
+@traced("check_eligibility")
+def check_eligibility(user_profile):
+    catalog = get_catalog()
+
+    missing = [f for f in REQUIRED_FIELDS if not user_profile.get(f)]
     if missing:
         return {
             "eligible": [],
@@ -17,27 +43,153 @@ def check_eligibility(user_profile):
 
     age = user_profile.get("age")
     income = user_profile.get("income")
-    state = user_profile.get("state").lower()
 
-    for scheme in schemes:
-        reasons = []
+    # Only schemes whose thresholds this profile crosses are touched;
+    # everything else is eligible.
+    reasons = {}
+    for i in catalog.below_min_age(age):
+        reasons.setdefault(i, []).append("Age below minimum requirement")
+
+    for i in catalog.above_max_age(age):
+        reasons.setdefault(i, []).append("Age above maximum limit")
+
+    for i in catalog.over_income(income):
+        reasons.setdefault(i, []).append("Income exceeds limit")
+
+    names = catalog.names
+    eligible = [
+        name for i, name in enumerate(names)
+        if i not in reasons
+    ]
+    not_eligible = [
+        {
+            "scheme": names[i],
+            "reasons": reasons[i]
+        }
+        for i in sorted(reasons)
+    ]
+
+    return {
+        "eligible": eligible,
+        "not_eligible": not_eligible
+    }
+
+
+# ================= BATCH ELIGIBILITY =================
+
+def check_eligibility_batch(ages, incomes, state_codes, match_state=False, catalog=None):
+    """
+    Vectorized check over columnar profiles.
+
+    ages, incomes, state_codes: 1-D arrays of equal length. State codes
+    come from the catalog's state_code(); NaN ages/incomes and
+    MISSING_STATE codes mark fields that were not given.
+    match_state: also fail schemes not offered in the profile's state.
+    catalog: the snapshot the state codes came from (default: current).
+    With match_state=False the rules are exactly those of check_eligibility.
 
-        if "min_age" in scheme and age < scheme["min_age"]:
-            reasons.append("Age below minimum requirement")
+    Returns a dict with:
+    - schemes: scheme names (matrix columns)
+    - eligible: bool matrix, profiles x schemes
+    - reasons: uint8 matrix of REASON_* bits per profile and scheme
+    - missing: bool per profile, True if age/income/state was not given
+      (check_eligibility's "Missing required fields")
+    - missing_fields: uint8 of MISSING_* bits per profile
+    """
+    import numpy as np
 
-        if "max_age" in scheme and age > scheme["max_age"]:
-            reasons.append("Age above maximum limit")
+    catalog = catalog or get_catalog()
+    columns = catalog.arrays()
 
-        if income > scheme["max_income"]:
-            reasons.append("Income exceeds limit")
+    ages = np.asarray(ages, dtype=np.float64)
+    incomes = np.asarray(incomes, dtype=np.float64)
+    state_codes = np.asarray(state_codes, dtype=np.int64)
 
-        if reasons:
+    # Same rule as check_eligibility: falsy or absent fields are missing.
+    missing_fields = (
+        (np.isnan(ages) | (ages == 0)).view(np.uint8) * np.uint8(MISSING_AGE)
+        | (np.isnan(incomes) | (incomes == 0)).view(np.uint8) * np.uint8(MISSING_INCOME)
+        | (state_codes == MISSING_STATE).view(np.uint8) * np.uint8(MISSING_STATE_FIELD)
+    )
+    missing = missing_fields != 0
+
+    age_col = ages[:, None]
+    reasons = (age_col < columns["min_age"]).view(np.uint8) * np.uint8(REASON_MIN_AGE)
+    reasons |= (age_col > columns["max_age"]).view(np.uint8) * np.uint8(REASON_MAX_AGE)
+    reasons |= (incomes[:, None] > columns["max_income"]).view(np.uint8) * np.uint8(REASON_INCOME)
+
+    if match_state:
+        # A state name that no scheme lists still counts as given
+        state_matrix = columns["state_matrix"]
+        rows = np.where(state_codes >= 0, state_codes, len(state_matrix) - 1)
+        reasons |= (~state_matrix[rows]).view(np.uint8) * np.uint8(REASON_STATE)
+
+    reasons[missing] = 0
+    eligible = (reasons == 0) & ~missing[:, None]
+
+    return {
+        "schemes": catalog.names,
+        "eligible": eligible,
+        "reasons": reasons,
+        "missing": missing,
+        "missing_fields": missing_fields
+    }
+
+
+def iter_eligibility_batch(ages, incomes, state_codes, chunk_size=BATCH_CHUNK_SIZE, match_state=False,
+                           catalog=None):
+    """
+    Streams check_eligibility_batch over row chunks so only one chunk's
+    matrix is in memory at a time. Inputs only need to support len() and
+    slicing, so np.memmap columns work for rolls larger than RAM.
+    Yields results with an extra "offset" key (first row of the chunk).
+    Every chunk is checked against the same catalog snapshot.
+    """
+    catalog = catalog or get_catalog()
+    for start in range(0, len(ages), chunk_size):
+        stop = start + chunk_size
+        result = check_eligibility_batch(
+            ages[start:stop], incomes[start:stop], state_codes[start:stop], match_state, catalog
+        )
+        result["offset"] = start
+        yield result
+
+
+def stream_eligibility_batch(chunks, match_state=False, catalog=None):
+    """
+    Like iter_eligibility_batch, but for inputs that arrive as an iterable
+    of (ages, incomes, state_codes) chunks, e.g. read from a file.
+    """
+    catalog = catalog or get_catalog()
+    offset = 0
+    for ages, incomes, state_codes in chunks:
+        result = check_eligibility_batch(ages, incomes, state_codes, match_state, catalog)
+        result["offset"] = offset
+        offset += len(result["missing"])
+        yield result
+
+
+def batch_row_result(result, row):
+    """Expands one row of a batch result into check_eligibility's format."""
+    if result["missing"][row]:
+        bits = int(result["missing_fields"][row])
+        missing = [text for bit, text in MISSING_TEXT.items() if bits & bit]
+        return {
+            "eligible": [],
+            "not_eligible": [],
+            "error": f"Missing required fields: {', '.join(missing)}"
+        }
+
+    eligible = []
+    not_eligible = []
+    for name, bits in zip(result["schemes"], result["reasons"][row].tolist()):
+        if bits:
             not_eligible.append({
-                "scheme": scheme["name"],
-                "reasons": reasons
+                "scheme": name,
+                "reasons": [text for bit, text in REASON_TEXT.items() if bits & bit]
             })
         else:
-            eligible.append(scheme["name"])
+            eligible.append(name)
 
     return {
         "eligible": eligible,
@@ -0,0 +1,174 @@
+from tools.scheme_retriever import get_catalog
+from tools.eligibility_engine import REASON_TEXT
+
+FIELDS = ("age", "income", "state")
+
+REASON_ORDER = list(REASON_TEXT.values())
+
+# Plausible answers used to score how well a question splits the
+# remaining candidates (the real distribution is unknown)
+AGE_PRIOR = tuple(range(5, 100, 5))
+INCOME_PRIOR = (0, 25000, 50000, 100000, 150000, 200000, 250000, 300000, 500000, 800000, 1200000, 2000000)
+
+
+class EligibilitySession:
+    """
+    Eligibility evaluated as profile fields arrive.
+
+    Every scheme starts as a candidate; each field prunes the schemes it
+    rules out, touching only those (via the catalog's interval indexes).
+    is_decided() is True once no unknown field can change which
+    candidates remain, and next_field() picks the question that best
+    splits them.
+
+    This is the agent's rule for when to stop asking, looser than
+    check_eligibility, which requires age, income and state whatever
+    they could change. For a complete profile both give the same result.
+
+    match_state=False follows check_eligibility, which does not filter
+    by state; with True, schemes not offered in the state are pruned.
+    """
+
+    def __init__(self, catalog=None, match_state=False):
+        self.catalog = catalog or get_catalog()
+        self.match_state = match_state
+        self.profile = {field: None for field in FIELDS}
+        self.candidates = set(range(len(self.catalog)))
+        self.reasons = {}
+
+    @classmethod
+    def attach(cls, memory, **kwargs):
+        """Session fed by memory.update_profile, starting from its current profile."""
+        session = cls(**kwargs)
+        for field, value in memory.get_memory_snapshot()["profile"].items():
+            if value is not None:
+                session.update(field, value)
+        memory.add_listener(session.update)
+        return session
+
+    # ---- updates ----
+
+    def update(self, field, value):
+        if field not in FIELDS:
+            return
+        if self.profile[field] is not None:
+            # A changed answer cannot be un-pruned incrementally
+            self.profile[field] = value
+            self._rebuild()
+            return
+
+        self.profile[field] = value
+        # Falsy values count as not given, as in check_eligibility
+        if value:
+            self._prune(field, value)
+
+    def _rebuild(self):
+        profile = self.profile
+        self.profile = {field: None for field in FIELDS}
+        self.candidates = set(range(len(self.catalog)))
+        self.reasons = {}
+        for field, value in profile.items():
+            if value is not None:
+                self.update(field, value)
+
+    def _prune(self, field, value):
+        catalog = self.catalog
+        if field == "age":
+            self._fail(catalog.below_min_age(value), "Age below minimum requirement")
+            self._fail(catalog.above_max_age(value), "Age above maximum limit")
+        elif field == "income":
+            self._fail(catalog.over_income(value), "Income exceeds limit")
+        elif self.match_state:
+            offered = set(catalog.for_state(value))
+            self._fail([i for i in self.candidates if i not in offered], "Scheme not offered in state")
+
+    def _fail(self, ids, reason):
+        for i in ids:
+            self.candidates.discard(i)
+            self.reasons.setdefault(i, []).append(reason)
+
+    # ---- queries ----
+
+    def unknown_fields(self):
+        return [field for field in FIELDS if not self.profile[field]]
+
+    def _matters(self, field):
+        if field == "state" and not self.match_state:
+            return False
+        return not self.candidates.isdisjoint(self.catalog.constrained(field))
+
+    def relevant_fields(self):
+        """Unknown fields whose answer could still rule out a candidate."""
+        return [field for field in self.unknown_fields() if self._matters(field)]
+
+    def is_decided(self):
+        return not self.relevant_fields()
+
+    def next_field(self, exclude=()):
+        """
+        The relevant unknown field that best splits the candidates, i.e.
+        whose plausible answers rule out closest to half of them on
+        average. None if no field (outside exclude) is worth asking.
+        """
+        fields = [field for field in self.relevant_fields() if field not in exclude]
+        if not fields:
+            return None
+        return max(fields, key=lambda field: (self._split_score(field), -FIELDS.index(field)))
+
+    def _split_score(self, field):
+        catalog = self.catalog
+        candidates = self.candidates
+        if field == "age":
+            answers = AGE_PRIOR
+            failing = lambda a: len(candidates & (set(catalog.below_min_age(a)) | set(catalog.above_max_age(a))))
+        elif field == "income":
+            answers = INCOME_PRIOR
+            failing = lambda v: len(candidates.intersection(catalog.over_income(v)))
+        else:
+            answers = catalog.state_names
+            failing = lambda s: len(candidates.difference(catalog.for_state(s)))
+
+        if not answers:
+            return 0.0
+        n = len(candidates)
+        return sum(min(f, n - f) for f in map(failing, answers)) / len(answers)
+
+    def result(self):
+        """
+        check_eligibility-style result: a "Missing required fields" error
+        listing the fields that could still change the outcome until the
+        session is decided, then the final outcome, with reasons for the
+        fields that were given.
+        """
+        missing = self.relevant_fields()
+        if missing:
+            return {
+                "eligible": [],
+                "not_eligible": [],
+                "error": f"Missing required fields: {', '.join(missing)}"
+            }
+
+        names = self.catalog.names
+        return {
+            "eligible": [names[i] for i in sorted(self.candidates)],
+            "not_eligible": [
+                {
+                    "scheme": names[i],
+                    "reasons": sorted(self.reasons[i], key=REASON_ORDER.index)
+                }
+                for i in sorted(self.reasons)
+            ]
+        }
+
+
+# 🧪 TEST
+if __name__ == "__main__":
+    session = EligibilitySession()
+    print("Ask first:", session.next_field())
+
+    session.update("age", 60)
+    print("Candidates after age:", [session.catalog.names[i] for i in session.candidates])
+    print("Decided:", session.is_decided(), "next:", session.next_field())
+
+    session.update("income", 150000)
+    print("Decided:", session.is_decided(), session.result())
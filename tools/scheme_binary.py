@@ -0,0 +1,234 @@
+"""
+Precompiled, columnar form of schemes.json.
+
+schemes.json stays the source of truth; this module compiles it into a
+flat binary file that workers memory-map read-only. Opening it parses
+nothing: every column is a memoryview over the shared page cache, so
+startup is constant-time and N processes hold one copy of the catalog.
+
+    python -m tools.scheme_binary            # schemes.json -> schemes.bin
+
+Layout (little-endian, sections 8-byte aligned):
+
+    header     magic, version, scheme count, state count,
+               source mtime_ns and size (staleness check, as for .pyc)
+    sections   (offset, length) table, then the sections in SECTIONS order
+
+Missing thresholds are stored as NaN. Scheme and state names are
+interned into one UTF-8 blob each, addressed by an offsets column.
+"""
+import math
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import cached_property
+
+MAGIC = b"SCHEMES\0"
+VERSION = 1
+
+SECTIONS = (
+    "min_age", "max_age", "max_income",          # float64 per scheme
+    "min_age_keys", "min_age_ids",               # interval indexes: sorted
+    "max_age_keys", "max_age_ids",               # thresholds (float64) and
+    "max_income_keys", "max_income_ids",         # scheme ids (uint32)
+    "name_offsets", "name_blob",                 # scheme names
+    "state_name_offsets", "state_name_blob",     # sorted state names
+    "state_offsets", "state_ids",                # scheme ids per state code, last row central schemes
+    "scheme_state_offsets", "scheme_state_codes"  # state codes per scheme
+)
+
+_HEADER = struct.Struct("<8sIIIIqq")
+_SECTION = struct.Struct("<QQ")
+_ALIGN = 8
+
+
+# ================= COMPILE =================
+
+def scheme_states(scheme):
+    """States a scheme is limited to, lowercased; () for central schemes."""
+    if "states" in scheme:
+        return tuple(s.lower() for s in scheme["states"])
+    if "state" in scheme:
+        return (scheme["state"].lower(),)
+    return ()
+
+
+def _threshold(value):
+    return math.nan if value is None else float(value)
+
+
+def _sorted_index(values):
+    pairs = sorted((v, i) for i, v in enumerate(values) if not math.isnan(v))
+    return array("d", [v for v, _ in pairs]), array("I", [i for _, i in pairs])
+
+
+def _string_table(strings):
+    offsets = array("I", [0])
+    blob = bytearray()
+    for s in strings:
+        blob += s.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def _postings(rows):
+    offsets = array("I", [0])
+    ids = array("I")
+    for row in rows:
+        ids.extend(row)
+        offsets.append(len(ids))
+    return offsets, ids
+
+
+def compile_schemes(schemes, source_mtime_ns=0, source_size=0):
+    """schemes.json content (list of dicts) -> bytes of the binary catalog."""
+    if sys.byteorder != "little":
+        raise ValueError("Compiled scheme catalogs are little-endian only")
+
+    n = len(schemes)
+    min_age = array("d", [_threshold(s.get("min_age")) for s in schemes])
+    max_age = array("d", [_threshold(s.get("max_age")) for s in schemes])
+    max_income = array("d", [_threshold(s["max_income"]) for s in schemes])
+
+    states = [scheme_states(s) for s in schemes]
+    state_names = sorted({state for row in states for state in row})
+    codes = {state: code for code, state in enumerate(state_names)}
+
+    by_state = [[] for _ in range(len(state_names) + 1)]
+    for i, row in enumerate(states):
+        for state in row:
+            by_state[codes[state]].append(i)
+        if not row:
+            by_state[-1].append(i)
+
+    columns = {
+        "min_age": min_age,
+        "max_age": max_age,
+        "max_income": max_income
+    }
+    for field in ("min_age", "max_age", "max_income"):
+        columns[f"{field}_keys"], columns[f"{field}_ids"] = _sorted_index(columns[field])
+    columns["name_offsets"], columns["name_blob"] = _string_table(s["name"] for s in schemes)
+    columns["state_name_offsets"], columns["state_name_blob"] = _string_table(state_names)
+    columns["state_offsets"], columns["state_ids"] = _postings(by_state)
+    columns["scheme_state_offsets"], columns["scheme_state_codes"] = _postings(
+        [[codes[state] for state in row] for row in states]
+    )
+
+    payloads = [bytes(columns[name]) for name in SECTIONS]
+
+    offset = _aligned(_HEADER.size + _SECTION.size * len(SECTIONS))
+    table = []
+    for payload in payloads:
+        table.append((offset, len(payload)))
+        offset = _aligned(offset + len(payload))
+
+    out = bytearray(offset)
+    _HEADER.pack_into(out, 0, MAGIC, VERSION, n, len(state_names), len(SECTIONS),
+                      source_mtime_ns, source_size)
+    for k, ((start, length), payload) in enumerate(zip(table, payloads)):
+        _SECTION.pack_into(out, _HEADER.size + k * _SECTION.size, start, length)
+        out[start:start + length] = payload
+    return bytes(out)
+
+
+def _aligned(offset):
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def compile_file(source, target):
+    """Compiles source (schemes.json) into target, replacing it atomically."""
+    import json
+
+    stat = os.stat(source)
+    with open(source, "r", encoding="utf-8") as f:
+        data = compile_schemes(json.load(f), stat.st_mtime_ns, stat.st_size)
+
+    tmp = f"{target}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, target)
+    return len(data)
+
+
+# ================= LOAD =================
+
+def decode_strings(offsets, blob):
+    return [str(blob[offsets[i]:offsets[i + 1]], "utf-8") for i in range(len(offsets) - 1)]
+
+
+class CompiledCatalog:
+    """
+    Typed memoryviews over a compiled catalog buffer (an mmap or bytes).
+    Section names from SECTIONS are attributes; float columns index as
+    Python floats and id columns as ints, so bisect works on them as is.
+    """
+
+    def __init__(self, buffer):
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size:
+            raise ValueError("Not a compiled scheme catalog")
+        magic, version, n, n_states, n_sections, mtime_ns, size = _HEADER.unpack_from(view, 0)
+        if magic != MAGIC or version != VERSION or n_sections != len(SECTIONS):
+            raise ValueError("Not a compiled scheme catalog (or an older format)")
+        if sys.byteorder != "little":
+            raise ValueError("Compiled scheme catalogs are little-endian only")
+
+        self.buffer = buffer
+        self.count = n
+        self.state_count = n_states
+        self.source_mtime_ns = mtime_ns
+        self.source_size = size
+
+        for k, name in enumerate(SECTIONS):
+            start, length = _SECTION.unpack_from(view, _HEADER.size + k * _SECTION.size)
+            section = view[start:start + length]
+            if name.endswith("_blob"):
+                setattr(self, name, section)
+            elif name in SECTIONS[:3] or name.endswith("_keys"):
+                setattr(self, name, section.cast("d"))
+            else:
+                setattr(self, name, section.cast("I"))
+
+    # Names are decoded on first use: results hand them out, so a process
+    # that renders results needs the str objects anyway, and one that
+    # never does pays nothing. Numeric columns stay in the shared pages.
+    @cached_property
+    def names(self):
+        return decode_strings(self.name_offsets, self.name_blob)
+
+    @cached_property
+    def state_names(self):
+        return decode_strings(self.state_name_offsets, self.state_name_blob)
+
+    def state_row(self, code):
+        """Scheme ids for a state code; code == state_count gives central schemes."""
+        return self.state_ids[self.state_offsets[code]:self.state_offsets[code + 1]]
+
+    def is_fresh(self, source):
+        """True if compiled from source as it is now on disk."""
+        try:
+            stat = os.stat(source)
+        except OSError:
+            return False
+        return stat.st_mtime_ns == self.source_mtime_ns and stat.st_size == self.source_size
+
+
+def open_compiled(path):
+    """Memory-maps a compiled catalog read-only."""
+    with open(path, "rb") as f:
+        return CompiledCatalog(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+# 🧪 TEST
+if __name__ == "__main__":
+    from tools.scheme_retriever import SCHEME_FILE, BINARY_FILE
+
+    source = sys.argv[1] if len(sys.argv) > 1 else SCHEME_FILE
+    target = sys.argv[2] if len(sys.argv) > 2 else BINARY_FILE
+    size = compile_file(source, target)
+
+    compiled = open_compiled(target)
+    print(f"✅ {compiled.count} schemes, {compiled.state_count} states -> {target} ({size} bytes)")
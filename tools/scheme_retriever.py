@@ -1,8 +1,24 @@
 import json
+import math
 import os
+import threading
+from bisect import bisect_left, bisect_right
+
+from tools.scheme_binary import CompiledCatalog, compile_schemes, open_compiled
 
 SCHEME_FILE = os.path.join(os.path.dirname(__file__), "schemes.json")
 
+# Compiled by `python -m tools.scheme_binary`; used only while it matches
+# the current schemes.json, which remains the source of truth
+BINARY_FILE = os.getenv("SCHEME_BINARY_FILE", os.path.splitext(SCHEME_FILE)[0] + ".bin")
+
+# Partition key for schemes that do not list any state (central schemes)
+ALL_STATES = "*"
+
+# State codes for profiles whose state is not in the catalog / not given
+UNKNOWN_STATE = -1
+MISSING_STATE = -2
+
 
 def load_schemes():
     if not os.path.exists(SCHEME_FILE):
@@ -12,6 +28,200 @@ def load_schemes():
         return json.load(f)
 
 
+# ================= SCHEME CATALOG =================
+
+class CatalogSnapshot:
+    """
+    Compiled, indexed view of one version of schemes.json. Never
+    modified once built: a reload builds a new snapshot, so a reader
+    holding one sees a single consistent catalog throughout.
+
+    Columns are memoryviews (missing thresholds are NaN) and thresholds
+    are kept in sorted interval indexes, so a profile lookup only
+    touches the schemes whose limits it actually crosses.
+    """
+
+    def __init__(self, compiled, source, mtime=None):
+        self.source = source    # "binary" or "json"
+        self.mtime = mtime
+        self._compiled = compiled
+
+        self.min_age = compiled.min_age
+        self.max_age = compiled.max_age
+        self.max_income = compiled.max_income
+
+        # Interval indexes: (sorted thresholds, scheme ids in the same order)
+        self._min_age_index = (compiled.min_age_keys, compiled.min_age_ids)
+        self._max_age_index = (compiled.max_age_keys, compiled.max_age_ids)
+        self._max_income_index = (compiled.max_income_keys, compiled.max_income_ids)
+
+        self.state_names = list(compiled.state_names)
+        self.state_index = {state: compiled.state_row(code) for code, state in enumerate(self.state_names)}
+        self.state_index[ALL_STATES] = compiled.state_row(len(self.state_names))
+        self._state_codes = {s: code for code, s in enumerate(self.state_names)}
+
+        # Derived on first use; the same for every reader of this snapshot
+        self._arrays = None
+        self._constrained = {}
+
+    @property
+    def names(self):
+        return self._compiled.names
+
+    def __len__(self):
+        return self._compiled.count
+
+    def below_min_age(self, age):
+        """Scheme ids whose min_age is greater than age."""
+        keys, ids = self._min_age_index
+        return ids[bisect_right(keys, age):].tolist()
+
+    def above_max_age(self, age):
+        """Scheme ids whose max_age is less than age."""
+        keys, ids = self._max_age_index
+        return ids[:bisect_left(keys, age)].tolist()
+
+    def over_income(self, income):
+        """Scheme ids whose max_income is less than income."""
+        keys, ids = self._max_income_index
+        return ids[:bisect_left(keys, income)].tolist()
+
+    def for_state(self, state):
+        """Scheme ids available in a state, including central schemes."""
+        return sorted([*self.state_index.get(state.lower(), ()), *self.state_index.get(ALL_STATES, ())])
+
+    def scheme_states(self, i):
+        """States scheme i is limited to; () for central schemes."""
+        offsets = self._compiled.scheme_state_offsets
+        codes = self._compiled.scheme_state_codes[offsets[i]:offsets[i + 1]]
+        return tuple(self.state_names[code] for code in codes)
+
+    def constrained(self, field):
+        """Ids of schemes with a limit on field ("age", "income" or "state")."""
+        if field not in self._constrained:
+            if field == "age":
+                ids = [i for i, (lo, hi) in enumerate(zip(self.min_age, self.max_age))
+                       if not (math.isnan(lo) and math.isnan(hi))]
+            elif field == "income":
+                ids = [i for i, limit in enumerate(self.max_income) if not math.isnan(limit)]
+            else:
+                offsets = self._compiled.scheme_state_offsets
+                ids = [i for i in range(len(self)) if offsets[i + 1] > offsets[i]]
+            self._constrained[field] = frozenset(ids)
+        return self._constrained[field]
+
+    def state_code(self, state):
+        """Integer code for a state name (UNKNOWN_STATE / MISSING_STATE otherwise)."""
+        if not state:
+            return MISSING_STATE
+        return self._state_codes.get(state.lower(), UNKNOWN_STATE)
+
+    def arrays(self):
+        """
+        Columnar NumPy view of the catalog for vectorized evaluation.
+        Missing age limits become -inf/+inf so they never fail a profile.
+        The state matrix has one row per state code plus a final row for
+        unknown states (central schemes only).
+        """
+        if self._arrays is None:
+            import numpy as np
+
+            n = len(self)
+            min_age = np.frombuffer(self.min_age, dtype=np.float64)
+            max_age = np.frombuffer(self.max_age, dtype=np.float64)
+            min_age = np.where(np.isnan(min_age), -np.inf, min_age)
+            max_age = np.where(np.isnan(max_age), np.inf, max_age)
+            # Zero-copy; a NaN income limit never fails a profile
+            max_income = np.frombuffer(self.max_income, dtype=np.float64)
+
+            state_matrix = np.zeros((len(self.state_names) + 1, n), dtype=bool)
+            for code, state in enumerate(self.state_names):
+                state_matrix[code, np.frombuffer(self.state_index[state], dtype=np.uint32)] = True
+            state_matrix[:, np.frombuffer(self.state_index[ALL_STATES], dtype=np.uint32)] = True
+
+            self._arrays = {
+                "min_age": min_age.reshape(1, n),
+                "max_age": max_age.reshape(1, n),
+                "max_income": max_income.reshape(1, n),
+                "state_matrix": state_matrix
+            }
+        return self._arrays
+
+
+class SchemeCatalog:
+    """
+    schemes.json on disk, published as CatalogSnapshot objects.
+
+    The file is loaded once and again only when its mtime changes. If
+    binary_path holds a compiled copy of the current file it is
+    memory-mapped instead of parsing the JSON, so worker processes start
+    instantly and share its pages; otherwise the JSON is compiled in
+    memory into the same layout.
+
+    A reload publishes the new snapshot with one attribute assignment.
+    Readers take `snapshot` once and query that object, so a reload
+    mid-request never mixes two versions of the catalog.
+    """
+
+    def __init__(self, path=SCHEME_FILE, binary_path=BINARY_FILE):
+        self.path = path
+        self.binary_path = binary_path
+        self.snapshot = None
+        self._lock = threading.Lock()
+
+    @property
+    def source(self):
+        """"binary" or "json", for the current snapshot."""
+        snapshot = self.snapshot
+        return snapshot.source if snapshot is not None else None
+
+    def refresh(self):
+        """Reloads the catalog if the file changed. Returns True on reload."""
+        if not os.path.exists(self.path):
+            raise FileNotFoundError("schemes.json not found")
+
+        mtime = os.stat(self.path).st_mtime_ns
+        if self.snapshot is not None and self.snapshot.mtime == mtime:
+            return False
+
+        with self._lock:
+            if self.snapshot is not None and self.snapshot.mtime == mtime:
+                return False
+            compiled = self._open_binary()
+            source = "binary"
+            if compiled is None:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    compiled = CompiledCatalog(compile_schemes(json.load(f)))
+                source = "json"
+            self.snapshot = CatalogSnapshot(compiled, source, mtime)
+        return True
+
+    def _open_binary(self):
+        """The compiled catalog if it exists and matches schemes.json, else None."""
+        if not self.binary_path or not os.path.exists(self.binary_path):
+            return None
+        try:
+            compiled = open_compiled(self.binary_path)
+        except (OSError, ValueError):
+            return None
+        return compiled if compiled.is_fresh(self.path) else None
+
+
+_catalog = None
+
+
+def get_catalog():
+    """
+    Current CatalogSnapshot of the shared catalog, refreshed from disk if
+    schemes.json changed. Take it once per request and keep using it.
+    """
+    global _catalog
+    if _catalog is None:
+        _catalog = SchemeCatalog()
+    _catalog.refresh()
+    return _catalog.snapshot
+
+
 # 🧪 TEST
 if __name__ == "__main__":
     schemes = load_schemes()
@@ -0,0 +1,179 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+from logger import session_id_var, turn_id_var
+
+# Off by default: span() then returns a shared no-op context manager and
+# costs one global lookup per call. Set TRACING=1 or call enable().
+TRACING_ENABLED = os.getenv("TRACING", "0") == "1"
+
+MAX_SPANS = 100000
+
+_spans = deque(maxlen=MAX_SPANS)
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "start")
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        _spans.append((
+            self.name, self.start, end - self.start, threading.get_ident(),
+            session_id_var.get(), turn_id_var.get(), self.args
+        ))
+        return False
+
+
+# ================= RECORDING =================
+
+def enable():
+    global TRACING_ENABLED
+    TRACING_ENABLED = True
+
+
+def disable():
+    global TRACING_ENABLED
+    TRACING_ENABLED = False
+
+
+def reset():
+    _spans.clear()
+
+
+def span(name, **args):
+    """Times the enclosed block as one stage; a no-op unless tracing is enabled."""
+    if not TRACING_ENABLED:
+        return _NOOP
+    return _Span(name, args)
+
+
+def traced(name):
+    """Decorator form of span() for whole functions."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not TRACING_ENABLED:
+                return func(*args, **kwargs)
+            with _Span(name, {}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ================= EXPORT =================
+
+def chrome_trace():
+    """Recorded spans in Chrome trace-event format (chrome://tracing, Perfetto)."""
+    pid = os.getpid()
+    events = []
+    for name, start, duration, tid, session_id, turn_id, args in list(_spans):
+        event_args = dict(args)
+        if session_id is not None:
+            event_args["session_id"] = session_id
+        if turn_id is not None:
+            event_args["turn_id"] = turn_id
+        events.append({
+            "name": name,
+            "cat": name.split(".")[0],
+            "ph": "X",
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": pid,
+            "tid": tid,
+            "args": event_args
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def export_chrome_trace(path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(chrome_trace(), f, ensure_ascii=False)
+    return path
+
+
+def _percentile(ordered, q):
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def summary():
+    """Per-stage count, mean and p50/p95/p99 in milliseconds, across all sessions."""
+    durations = {}
+    for name, _, duration, *_ in list(_spans):
+        durations.setdefault(name, []).append(duration * 1000)
+
+    stats = {}
+    for name, values in durations.items():
+        values.sort()
+        stats[name] = {
+            "count": len(values),
+            "mean_ms": sum(values) / len(values),
+            "p50_ms": _percentile(values, 0.50),
+            "p95_ms": _percentile(values, 0.95),
+            "p99_ms": _percentile(values, 0.99),
+            "total_ms": sum(values)
+        }
+    return stats
+
+
+def format_summary(stats=None):
+    """summary() as a text table, slowest total first."""
+    stats = stats or summary()
+    lines = [f"{'stage':32} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'total ms':>10}"]
+    for name, s in sorted(stats.items(), key=lambda item: item[1]["total_ms"], reverse=True):
+        lines.append(
+            f"{name:32} {s['count']:6d} {s['p50_ms']:9.1f} {s['p95_ms']:9.1f} "
+            f"{s['p99_ms']:9.1f} {s['total_ms']:10.1f}"
+        )
+    return "\n".join(lines)
+
+
+# 🧪 TEST
+if __name__ == "__main__":
+    iterations = 1000000
+
+    disable()
+    start = time.perf_counter()
+    for _ in range(iterations):
+        with span("noop"):
+            pass
+    off_ns = (time.perf_counter() - start) / iterations * 1e9
+
+    enable()
+    start = time.perf_counter()
+    for _ in range(iterations // 10):
+        with span("demo.stage", size=1):
+            pass
+    on_ns = (time.perf_counter() - start) / (iterations // 10) * 1e9
+
+    print(f"⏱️ span() overhead: {off_ns:.0f} ns disabled, {on_ns:.0f} ns enabled")
+    print(format_summary())
@@ -1,7 +1,14 @@
-from gtts import gTTS
-import pygame
+# gTTS, pygame and sounddevice are imported on first use to keep startup fast
+import numpy as np
+import hashlib
+import io
 import os
-import time
+import queue
+import re
+import threading
+from collections import OrderedDict, deque
+from tracing import span, traced
+from logger import log_warning
 
 LANGUAGE_MAP = {
     "hi": "hi",
@@ -11,29 +18,402 @@ LANGUAGE_MAP = {
     "bn": "bn"
 }
 
-def speak(text, language="hi"):
+TTS_CACHE_DIR = os.path.join("audio", "tts_cache")
+MEMORY_CACHE_BYTES = 16 * 1024 * 1024
+DISK_CACHE_BYTES = 256 * 1024 * 1024
+
+# gTTS produces 24 kHz mono audio; playback runs at the same rate
+PLAYBACK_SAMPLE_RATE = 24000
+PLAYBACK_BLOCK_SIZE = 1024
+
+# Streaming speak: segments longer than this are split again at clause
+# boundaries; at most STREAM_QUEUE_DEPTH segments are synthesized ahead.
+MAX_SEGMENT_CHARS = 120
+STREAM_QUEUE_DEPTH = 2
+
+# Sentence ends (incl. Devanagari danda/double danda) and clause breaks.
+# A boundary needs trailing whitespace, so "50,000" or "2.5" never split.
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?।॥])\s+")
+CLAUSE_BOUNDARY = re.compile(r"(?<=[,;:،])\s+")
+
+
+# ================= AUDIO CACHE =================
+
+class AudioCache:
+    """
+    Content-addressed cache of synthesized MP3 audio keyed by (text, language).
+    Both the in-memory and the on-disk tier are LRU-bounded by size.
+    """
+
+    def __init__(self, directory=TTS_CACHE_DIR, memory_limit=MEMORY_CACHE_BYTES, disk_limit=DISK_CACHE_BYTES):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(text, language):
+        return hashlib.sha256(f"{language}\0{text}".encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.mp3")
+
+    def get(self, text, language):
+        key = self.key(text, language)
+
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                return audio
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                audio = f.read()
+            os.utime(path)  # mark as recently used for disk eviction
+        except OSError:
+            return None
+
+        with self._lock:
+            self._remember(key, audio)
+        return audio
+
+    def put(self, text, language, audio):
+        key = self.key(text, language)
+
+        with self._lock:
+            self._remember(key, audio)
+
+        # Write-then-rename so concurrent readers never see partial files
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, path)
+        self._evict_disk()
+
+    def __contains__(self, item):
+        text, language = item
+        key = self.key(text, language)
+        return key in self._memory or os.path.exists(self._path(key))
+
+    def _remember(self, key, audio):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.memory_limit and len(self._memory) > 1:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        entries = []
+        total = 0
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+
+_cache = None
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        _cache = AudioCache()
+    return _cache
+
+
+# ================= SYNTHESIS =================
+
+def synthesize(text, language="hi"):
+    """Calls the TTS backend and returns MP3 bytes."""
+    from gtts import gTTS
+    buffer = io.BytesIO()
+    gTTS(text=text, lang=LANGUAGE_MAP.get(language, "hi")).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def get_audio(text, language="hi"):
+    """MP3 bytes for text, from the cache when possible."""
     lang_code = LANGUAGE_MAP.get(language, "hi")
+    cache = get_cache()
+
+    audio = cache.get(text, lang_code)
+    if audio is None:
+        with span("tts.synthesize", language=lang_code):
+            audio = synthesize(text, lang_code)
+        cache.put(text, lang_code, audio)
+    return audio
+
+
+def warm_up(phrases):
+    """
+    Pre-synthesizes (text, language) pairs that are not cached yet.
+    Returns the number of phrases synthesized; a phrase that fails is
+    logged and left for speak() to synthesize on demand.
+    """
+    cache = get_cache()
+    synthesized = 0
+
+    for text, language in phrases:
+        lang_code = LANGUAGE_MAP.get(language, "hi")
+        if (text, lang_code) in cache:
+            continue
+        try:
+            audio = synthesize(text, lang_code)
+        except Exception as e:
+            log_warning("TTS warm-up failed", language=lang_code, text=text, error=str(e))
+            continue
+        cache.put(text, lang_code, audio)
+        synthesized += 1
+
+    return synthesized
+
+
+# ================= DECODING =================
+
+_decoder_lock = threading.Lock()
 
-    os.makedirs("audio", exist_ok=True)
-    filename = f"audio/tts_{int(time.time())}.mp3"
 
-    tts = gTTS(text=text, lang=lang_code)
-    tts.save(filename)
+def decode_mp3(audio):
+    """
+    Decodes MP3 bytes to a 1-D int16 array at PLAYBACK_SAMPLE_RATE.
+    pygame is used only as a decoder: its mixer is initialized once on
+    SDL's dummy driver so it never holds the output device.
+    """
+    import pygame
+    with _decoder_lock:
+        if not pygame.mixer.get_init():
+            os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+            pygame.mixer.init(frequency=PLAYBACK_SAMPLE_RATE, size=-16, channels=1, allowedchanges=0)
+        sound = pygame.mixer.Sound(file=io.BytesIO(audio))
+        return np.frombuffer(sound.get_raw(), dtype=np.int16)
 
-    pygame.mixer.init()
-    pygame.mixer.music.load(filename)
-    pygame.mixer.music.play()
 
-    while pygame.mixer.music.get_busy():
-        time.sleep(0.1)
+# ================= PLAYBACK ENGINE =================
 
-    pygame.mixer.music.stop()
-    pygame.mixer.quit()
+class Clip:
+    """A queued piece of PCM audio with a completion signal."""
+
+    def __init__(self, pcm, on_done=None):
+        self.pcm = pcm
+        self.position = 0
+        self.on_done = on_done
+        self.done = threading.Event()
+
+    @property
+    def duration(self):
+        return len(self.pcm) / PLAYBACK_SAMPLE_RATE
+
+    @property
+    def remaining_seconds(self):
+        return (len(self.pcm) - self.position) / PLAYBACK_SAMPLE_RATE
+
+    def wait(self, timeout=None):
+        return self.done.wait(timeout)
+
+    def _finish(self):
+        self.done.set()
+        if self.on_done:
+            self.on_done(self)
+
+
+class PlaybackEngine:
+    """
+    Long-lived output stream. The device is opened once; queued clips are
+    pulled by the audio callback back to back, so consecutive clips play
+    without gaps and completion is signalled from the callback.
+    """
+
+    def __init__(self, samplerate=PLAYBACK_SAMPLE_RATE, blocksize=PLAYBACK_BLOCK_SIZE):
+        self.samplerate = samplerate
+        self.blocksize = blocksize
+        self._clips = deque()
+        self._stream = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._stream is None:
+                import sounddevice as sd
+                self._stream = sd.OutputStream(
+                    samplerate=self.samplerate,
+                    channels=1,
+                    dtype="int16",
+                    blocksize=self.blocksize,
+                    callback=self._callback
+                )
+                self._stream.start()
+
+    def close(self):
+        with self._lock:
+            if self._stream is not None:
+                self._stream.stop()
+                self._stream.close()
+                self._stream = None
+        while self._clips:
+            self._clips.popleft()._finish()
+
+    def play(self, pcm, on_done=None):
+        """Queues PCM after anything already playing. Returns the Clip."""
+        clip = Clip(pcm, on_done)
+        self._clips.append(clip)
+        self.start()
+        return clip
+
+    @property
+    def busy(self):
+        return bool(self._clips)
+
+    def _callback(self, outdata, frames, time_info, status):
+        out = outdata[:, 0]
+        filled = 0
+
+        while filled < frames and self._clips:
+            clip = self._clips[0]
+            n = min(frames - filled, len(clip.pcm) - clip.position)
+            out[filled:filled + n] = clip.pcm[clip.position:clip.position + n]
+            clip.position += n
+            filled += n
+
+            if clip.position >= len(clip.pcm):
+                self._clips.popleft()
+                clip._finish()
+
+        out[filled:] = 0
+
+
+_engine = None
+
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = PlaybackEngine()
+    return _engine
+
+
+# ================= PLAYBACK =================
+
+def speak_async(text, language="hi", on_done=None):
+    """Queues text for playback and returns its Clip without waiting."""
+    audio = get_audio(text, language)
+    with span("tts.decode"):
+        pcm = decode_mp3(audio)
+    return get_engine().play(pcm, on_done)
+
+
+@traced("speak")
+def speak(text, language="hi"):
+    clip = speak_async(text, language)
+    with span("tts.playback"):
+        clip.wait()
+
+
+# ================= STREAMING SPEAK =================
+
+def split_segments(text, max_chars=MAX_SEGMENT_CHARS):
+    """
+    Splits text into sentences, and long sentences into groups of clauses
+    no longer than max_chars (a single clause may still exceed it).
+    """
+    segments = []
+    for sentence in SENTENCE_BOUNDARY.split(text.strip()):
+        if len(sentence) <= max_chars:
+            if sentence:
+                segments.append(sentence)
+            continue
+
+        current = ""
+        for clause in CLAUSE_BOUNDARY.split(sentence):
+            if current and len(current) + 1 + len(clause) > max_chars:
+                segments.append(current)
+                current = clause
+            else:
+                current = f"{current} {clause}" if current else clause
+        if current:
+            segments.append(current)
+
+    return segments
+
+
+@traced("speak_streaming")
+def speak_streaming(text, language="hi"):
+    """
+    Speaks text segment by segment: a producer thread synthesizes segment
+    N while segment N-1 plays, so time-to-first-audio depends only on the
+    first segment. Blocks until the last segment has finished playing.
+    If playback fails, the producer is stopped and joined before the
+    error propagates.
+    """
+    segments = split_segments(text)
+    if len(segments) <= 1:
+        return speak(text, language)
+
+    ready = queue.Queue(maxsize=STREAM_QUEUE_DEPTH)
+    stop = threading.Event()
+
+    def put(item):
+        # Gives up once the consumer has stopped, instead of blocking on a full queue
+        while not stop.is_set():
+            try:
+                ready.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for segment in segments:
+                if stop.is_set() or not put(decode_mp3(get_audio(segment, language))):
+                    return
+        except Exception as e:
+            put(e)
+        put(None)
+
+    producer = threading.Thread(target=produce, name="tts-producer", daemon=True)
+    producer.start()
 
     try:
-        os.remove(filename)
-    except:
-        pass
+        engine = get_engine()
+        last_clip = None
+        while True:
+            pcm = ready.get()
+            if pcm is None:
+                break
+            if isinstance(pcm, Exception):
+                raise pcm
+            last_clip = engine.play(pcm)
+
+        if last_clip:
+            last_clip.wait()
+    finally:
+        stop.set()
+        while True:
+            try:
+                ready.get_nowait()
+            except queue.Empty:
+                break
+        producer.join()
 
     
 if __name__ == "__main__":
@@ -41,4 +421,4 @@ if __name__ == "__main__":
     speak("హలో! ఇది ఒక పరీక్ష.", language="te")
     speak("வணக்கம்! இது ஒரு சோதனை.", language="ta")
     speak("नमस्कार! ही एक चाचणी आहे.", language="mr")
-    speak("হ্যালো! এটি একটি পরীক্ষা।", language="bn")
\ No newline at end of file
+    speak("হ্যালো! এটি একটি পরীক্ষা।", language="bn")